@@ -0,0 +1,710 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks for build_CV.py
+- No third-party dependencies (stdlib only)
+- Each benchmark also checks the optimized code against a reference copy of the
+  previous implementation, so a speedup never silently changes the HTML.
+
+Usage:
+  python bench_CV.py inline [--lines N] [--dense N] [--repeat R]
+  python bench_CV.py dates  [--count N] [--repeat R]
+  python bench_CV.py xpl    [--fixtures PATH] [--repeat R]
+  python bench_CV.py cv     [--sections N] [--bullets N] [--callouts N] [--nav-pages N]
+                            [--piped N] [--url-only N] [--repeat R] [--json PATH] [--compare PATH]
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from urllib.parse import parse_qsl, urlparse
+
+import build_CV as cv
+
+
+# ---------------------------------------------------------------------------
+# Reference implementations (previous versions, kept only for comparison)
+# ---------------------------------------------------------------------------
+
+def legacy_md_inline_to_html(text: str) -> str:
+    """md_inline_to_html before the precompiled / single-expansion rewrite."""
+    s = text or ""
+    if not s:
+        return ""
+
+    token_map = {}
+    token_i = 0
+
+    def _new_token(html_snip: str) -> str:
+        nonlocal token_i
+        token_i += 1
+        tok = f"@@CVTOK{token_i}@@"
+        token_map[tok] = html_snip
+        return tok
+
+    code_pat = re.compile(r"`([^`\n]+)`")
+
+    def _code_repl(m):
+        inner = m.group(1)
+        return _new_token(f"<code>{html.escape(inner, quote=True)}</code>")
+
+    s0 = code_pat.sub(_code_repl, s)
+
+    link_pat = re.compile(r"(?<!!)\[(?P<label>[^\]\n]+)\]\((?P<url>[^\)\n]+)\)")
+
+    def _link_repl(m):
+        label = (m.group("label") or "").strip()
+        raw = (m.group("url") or "").strip()
+        url = raw.split()[0].strip() if raw else ""
+        safe = cv.sanitize_url(url)
+        if not (label and safe):
+            return m.group(0)
+        href = html.escape(safe, quote=True)
+        lab = html.escape(label, quote=True)
+        a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
+        return _new_token(a)
+
+    s1 = link_pat.sub(_link_repl, s0)
+
+    url_pat = re.compile(r"(?<![A-Za-z0-9_])https?://[^ \t\r\n<>\"']+", flags=re.I)
+
+    def _url_repl(m):
+        raw = m.group(0)
+        url = raw
+        trail = ""
+        while url and url[-1] in ".,;:!?)]}\"'":
+            trail = url[-1] + trail
+            url = url[:-1]
+        safe = cv.sanitize_url(url)
+        if not safe:
+            return raw
+        href = html.escape(safe, quote=True)
+        lab = html.escape(url, quote=True)
+        a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
+        return _new_token(a) + trail
+
+    s2 = url_pat.sub(_url_repl, s1)
+
+    bold_pat = re.compile(r"(\*\*|__)(?P<txt>[^\n]+?)\1")
+
+    def _bold_repl(m):
+        inner = (m.group("txt") or "").strip()
+        if not inner:
+            return m.group(0)
+        return _new_token(f"<strong>{html.escape(inner, quote=True)}</strong>")
+
+    s3 = bold_pat.sub(_bold_repl, s2)
+
+    hi_pat = re.compile(r"==(?P<txt>[^\n]+?)==")
+
+    def _hi_repl(m):
+        inner = (m.group("txt") or "").strip()
+        if not inner:
+            return m.group(0)
+        return _new_token(f"<mark class=\"hl\">{html.escape(inner, quote=True)}</mark>")
+
+    s4 = hi_pat.sub(_hi_repl, s3)
+
+    escaped = html.escape(s4, quote=True)
+    for tok in reversed(list(token_map.keys())):
+        escaped = escaped.replace(tok, token_map[tok])
+    return escaped
+
+
+def legacy_parse_pubdate_to_tuple(s: str):
+    """parse_pubdate_to_tuple before memoization and the hand-written fast path."""
+    if not s:
+        return None
+    ss = str(s).strip()
+    if not ss:
+        return None
+    if "early access" in ss.lower():
+        return None
+
+    m = re.search(r"((?:19|20)\d{2})[./-](\d{1,2})[./-](\d{1,2})", ss)
+    if m:
+        try:
+            return (int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except Exception:
+            pass
+
+    ss2 = re.sub(r"\s+", " ", ss.replace(",", " ")).strip()
+
+    for fmt in ("%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y", "%d %B %Y %H:%M:%S", "%d %b %Y %H:%M:%S"):
+        try:
+            dt = datetime.strptime(ss2, fmt)
+            return (dt.year, dt.month, dt.day)
+        except Exception:
+            continue
+
+    m2 = re.search(r"\b(January|February|March|April|May|June|July|August|September|October|November|December)\b\s+((?:19|20)\d{2})", ss2, flags=re.I)
+    if m2:
+        try:
+            dt = datetime.strptime(m2.group(0).title(), "%B %Y")
+            return (dt.year, dt.month, 0)
+        except Exception:
+            pass
+
+    m3 = re.search(r"(19|20)\d{2}", ss2)
+    if m3:
+        try:
+            return (int(m3.group(0)), 0, 0)
+        except Exception:
+            pass
+
+    return None
+
+
+def legacy_find_matching_brace(s: str, start: int) -> int:
+    """_find_matching_brace before the regex-driven scan (one Python step per character)."""
+    if start < 0 or start >= len(s) or s[start] != '{':
+        return -1
+    depth = 0
+    in_str = False
+    esc_next = False
+    quote = ''
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_str:
+            if esc_next:
+                esc_next = False
+                continue
+            if ch == '\\':
+                esc_next = True
+                continue
+            if ch == quote:
+                in_str = False
+                quote = ''
+            continue
+        else:
+            if ch in ('"', "'"):
+                in_str = True
+                quote = ch
+                continue
+            if ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    return i
+    return -1
+
+
+def legacy_extract_ieee_metadata_json(page: str):
+    """_extract_ieee_metadata_json before raw_decode: brace scan, slice, json.loads."""
+    if not page:
+        return None
+    idx = page.find('xplGlobal.document.metadata=')
+    if idx == -1:
+        return None
+    idx = page.find('{', idx)
+    if idx == -1:
+        return None
+    end = legacy_find_matching_brace(page, idx)
+    if end == -1:
+        return None
+    try:
+        return json.loads(page[idx:end + 1])
+    except Exception:
+        return cv._extract_ieee_metadata_fallback(page)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+_WORDS = ("wireless", "channel", "MIMO", "RIS", "beamforming", "semantic", "estimation",
+          "通信", "感知", "index", "modulation", "OTFS", "network", "learning", "&", "<b>")
+
+
+def synthetic_inline_lines(n: int, seed: int = 1) -> List[str]:
+    """Lines shaped like publication titles, news items and callout text."""
+    rnd = random.Random(seed)
+    pieces = [
+        lambda: rnd.choice(_WORDS),
+        lambda: "**{}**".format(rnd.choice(_WORDS)),
+        lambda: "__{} {}__".format(rnd.choice(_WORDS), rnd.choice(_WORDS)),
+        lambda: "`{}`".format(rnd.choice(_WORDS)),
+        lambda: "==Best Paper {}==".format(rnd.randint(2015, 2026)),
+        lambda: "[PDF](https://ieeexplore.ieee.org/document/{})".format(rnd.randint(10 ** 7, 10 ** 8)),
+        lambda: "https://example.com/p/{}.".format(rnd.randint(1, 999)),
+        lambda: "**[{}](example.org/{})**".format(rnd.choice(_WORDS), rnd.randint(1, 99)),
+        lambda: "@@CVTOK{}@@".format(rnd.randint(0, 12)),
+        lambda: "`**not bold**`",
+        lambda: "[`code` label](https://x.org/a_b)",
+    ]
+    out = []
+    for i in range(n):
+        k = rnd.randint(0, 24) if i % 4 else rnd.randint(40, 120)   # a few very long lines
+        out.append(" ".join(rnd.choice(pieces)() for _ in range(k)))
+    return out
+
+
+_MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December")
+
+
+def synthetic_pubdates(n: int, distinct: int = 0, seed: int = 1) -> List[str]:
+    """IEEE-style publicationDate strings in the mix seen on Xplore pages.
+
+    `distinct` > 0 limits the number of different strings (a real CV repeats dates).
+    """
+    rnd = random.Random(seed)
+
+    def one() -> str:
+        y = rnd.randint(2008, 2026)
+        mo = rnd.randint(1, 12)
+        d = rnd.randint(1, 28)
+        name = _MONTHS[mo - 1]
+        return rnd.choice((
+            "{} {} {}".format(d, name, y),
+            "{} {} {}".format(d, name[:3], y),
+            "{} {}".format(name, y),
+            "{} {}, {}".format(name, d, y),
+            "{}-{:02d}-{:02d}".format(y, mo, d),
+            "Early Access",
+            "{} {} {} 00:00:00".format(d, name, y),
+            "{}".format(y),
+            "{}-{} {}".format(name[:3], _MONTHS[mo % 12][:3], y),
+        ))
+
+    pool = [one() for _ in range(distinct)] if distinct > 0 else None
+    return [rnd.choice(pool) if pool else one() for _ in range(n)]
+
+
+def synthetic_xplore_page(n_authors: int, n_refs: int, seed: int = 1, chrome_note: str = "") -> str:
+    """An Xplore document page: <meta> head, the one-line metadata blob, page chrome.
+
+    The blob grows with the author and reference lists, like real pages of big papers.
+    `chrome_note` is put into the chrome after the blob (text a streamed fetch never reads).
+    """
+    rnd = random.Random(seed)
+    meta = {
+        "title": "On {} {} for {} Systems".format(*(rnd.choice(_WORDS) for _ in range(3))),
+        "authors": [{"name": "Author {} Name{}".format(chr(65 + i % 26), i),
+                     "affiliation": ["Dept. of {}, University {}".format(rnd.choice(_WORDS), i % 50)],
+                     "id": str(10 ** 8 + i)} for i in range(n_authors)],
+        "abstract": " ".join(rnd.choice(_WORDS) for _ in range(250)) + ' "quoted" {braces} \\ end',
+        "publicationTitle": "IEEE Transactions on Wireless Communications",
+        "publicationDate": "{} {} {}".format(rnd.randint(1, 28), rnd.choice(_MONTHS), rnd.randint(2015, 2026)),
+        "doi": "10.1109/TWC.{}.{}".format(rnd.randint(2015, 2026), rnd.randint(10 ** 6, 10 ** 7)),
+        "references": [{"order": str(i), "text": "R. Ref{}, \"{} {}\", {{IEEE}}, {}".format(
+            i, rnd.choice(_WORDS), rnd.choice(_WORDS), rnd.randint(1990, 2026))} for i in range(n_refs)],
+    }
+    head = ('<html><head><meta name="citation_title" content="{}">\n'
+            '<meta name="citation_online_date" content="2024/03/12">\n').format(html.escape(meta["title"]))
+    chrome = '<div class="nav">{}</div>\n'.format(" ".join(_WORDS)) * 200
+    if chrome_note:
+        chrome += '<div class="banner">{}</div>\n'.format(chrome_note)
+    return head + "<script>\nxplGlobal.document.metadata=" + json.dumps(meta) + ";\n</script>\n" + chrome
+
+
+SYNTH_HIGHLIGHT = "T. Person"
+SYNTH_DOC_ID_BASE = 9000000
+
+
+def synthetic_cv_md(sections: int = 8, bullets: int = 12, callouts: int = 1, nav_pages: int = 3,
+                    piped: int = 120, url_only: int = 30, seed: int = 1) -> str:
+    """A CV.md with `sections` plain sections (bullets + callouts each), a publications section
+    of `piped` hand-written and `url_only` Xplore-URL-only items, and `nav_pages` pages.
+
+    Sections go round-robin to the home page and the nav pages; publications get their own page.
+    URL-only items point at document ids SYNTH_DOC_ID_BASE + i (see `xplore_stub_server`).
+    """
+    rnd = random.Random(seed)
+    lines = synthetic_inline_lines(sections * (bullets + 2) + piped, seed=seed)
+    it = iter(lines)
+    titles = ["Section {}\\第{}节".format(i, i) for i in range(sections)]
+    pages = [[] for _ in range(nav_pages)]
+    for i, t in enumerate(titles):
+        if nav_pages and i % (nav_pages + 1):
+            pages[i % (nav_pages + 1) - 1].append(t)
+    nav = [{"title": "Papers", "href": "papers.html", "sections": [cv.PUB_SECTION_TITLE]}]
+    nav += [{"title": "Page {}".format(k), "href": "page{}.html".format(k), "sections": secs}
+            for k, secs in enumerate(pages) if secs]
+    nav.append({"title": "Blog", "href": "https://blog.example.com"})
+
+    out = [
+        "---",
+        "name: Test Person",
+        "role: Associate Professor",
+        "email: test@example.com",
+        "tags: [AI, Wireless, Signal]",
+        "title: Synthetic CV",
+        "highlight_author: " + SYNTH_HIGHLIGHT,
+        "banner: We are **recruiting** students. See [site](https://example.com)",
+        "writeback_enabled: false",
+        "fetch_interval: 0",
+        "bibtex_batch: 25",
+        "nav: [",
+        ",\n".join("  " + json.dumps(n, ensure_ascii=False) for n in nav),
+        "]",
+        "---",
+        "",
+    ]
+    for t in titles:
+        out += ["## " + t, "", next(it), ""]
+        out += ["- " + next(it) for _ in range(bullets)]
+        for c in range(callouts):
+            out += ["", ":::recruit Callout {}".format(c), "- " + next(it), "- PhD positions", ":::"]
+        out.append("")
+
+    out += ["## " + cv.PUB_SECTION_TITLE, ""]
+    people = ["A. Other", "B. Third", "Tao Person", "Person, T.", "C. Luo", "D. Fourth"]
+    for i in range(piped):
+        authors = ", ".join(rnd.sample(people, rnd.randint(2, 5))) + " and " + SYNTH_HIGHLIGHT
+        venue = "{} {}".format(rnd.choice(("IEEE Trans. Wireless Commun.", "ICC", "IEEE TVT Early Access",
+                                           "Journal")), synthetic_pubdates(1, seed=i)[0])
+        fields = ["Paper {}: {}".format(i, next(it)[:80] or "untitled"), authors, venue]
+        if i % 3 == 0:
+            fields.append("PDF: https://ieeexplore.ieee.org/document/{}".format(8000000 + i))
+        if i % 4 == 0:
+            fields.append("Code: https://github.com/x/p{}".format(i))
+        out.append("- " + " | ".join(f.replace("|", "/") for f in fields))
+    out += ["- https://ieeexplore.ieee.org/document/{}".format(SYNTH_DOC_ID_BASE + i) for i in range(url_only)]
+    out.append("")
+    return "\n".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(label: str, seconds: float, items: int, nbytes: int) -> None:
+    line = "  {:<28} {:9.2f} ms  {:10.0f} items/s".format(
+        label, seconds * 1000, items / seconds if seconds else 0.0)
+    if nbytes:
+        line += "  {:7.2f} MB/s".format(nbytes / seconds / 1e6 if seconds else 0.0)
+    print(line)
+
+
+def xplore_stub_server() -> ThreadingHTTPServer:
+    """A local stand-in for ieeexplore.ieee.org (started in a daemon thread).
+
+    /document/<id> answers with `synthetic_xplore_page` seeded by the id, and
+    /xpl/downloadCitations with one BibTeX entry per record id. Point
+    cv.IEEE_XPLORE_ORIGIN at http://127.0.0.1:<server_port> to use it.
+    """
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            pu = urlparse(self.path)
+            m = re.match(r"^/document/(\d+)/?$", pu.path)
+            if m:
+                doc_id = int(m.group(1))
+                body = synthetic_xplore_page(3 + doc_id % 8, 20 + doc_id % 60, seed=doc_id).replace(
+                    "Author A Name0", SYNTH_HIGHLIGHT)
+                ctype = "text/html; charset=utf-8"
+            elif pu.path == "/xpl/downloadCitations":
+                ids = dict(parse_qsl(pu.query)).get("recordIds", "").split(",")
+                body = "".join("@article{{{0},\r\nauthor={{{1} and B. Third}},\r\ntitle={{Stub paper {0}}},\r\n"
+                               "year={{2024}},\r\nurl={{https://ieeexplore.ieee.org/document/{0}}}}}\r\n\r\n".format(
+                                   d, SYNTH_HIGHLIGHT) for d in ids if d.isdigit())
+                ctype = "text/plain; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    # Keep-alive connections of finished fetch threads are reset: not worth a traceback
+    server.handle_error = lambda request, client_address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def reset_fetch_caches() -> None:
+    """Forget every fetched/derived IEEE result, so the next autofill goes to the server again."""
+    cv.META_DISK_CACHE.clear()
+    cv.PUB_META_CACHE.clear()
+    cv.IEEE_BIBTEX.clear()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_inline(args) -> None:
+    lines = synthetic_inline_lines(args.lines)
+    nbytes = sum(len(ln.encode("utf-8")) for ln in lines)
+
+    mismatches = [ln for ln in lines if cv.md_inline_to_html(ln) != legacy_md_inline_to_html(ln)]
+    if mismatches:
+        raise SystemExit("md_inline_to_html differs from the reference for {} line(s), e.g.:\n{}".format(
+            len(mismatches), mismatches[0]))
+
+    print("md_inline_to_html: {} lines, {:.1f} KB (output identical to reference)".format(len(lines), nbytes / 1024))
+    t_old = best_of(lambda: [legacy_md_inline_to_html(ln) for ln in lines], args.repeat)
+    t_new = best_of(lambda: [cv.md_inline_to_html(ln) for ln in lines], args.repeat)
+    report("reference", t_old, len(lines), nbytes)
+    report("md_inline_to_html", t_new, len(lines), nbytes)
+    print("  speedup: {:.2f}x".format(t_old / t_new if t_new else 0.0))
+    print("")
+
+    # One token-dense line: the old per-token str.replace restore was quadratic here
+    dense = " ".join("`c{0}` **b{0}** [l](https://x.org/{0})".format(i) for i in range(args.dense))
+    if cv.md_inline_to_html(dense) != legacy_md_inline_to_html(dense):
+        raise SystemExit("md_inline_to_html differs from the reference on the token-dense line")
+    t_old = best_of(lambda: legacy_md_inline_to_html(dense), args.repeat)
+    t_new = best_of(lambda: cv.md_inline_to_html(dense), args.repeat)
+    print("token-dense line: {} tokens".format(3 * args.dense))
+    report("reference", t_old, 1, len(dense))
+    report("md_inline_to_html", t_new, 1, len(dense))
+    print("  speedup: {:.2f}x".format(t_old / t_new if t_new else 0.0))
+    print("")
+
+    # Whole sections, as render_simple_md sees them (lists, paragraphs, callouts)
+    news = "\n".join(("- " if i % 3 else "") + ln for i, ln in enumerate(lines))
+    news = ":::recruit **Join** us\n- PhD positions\n:::\n" + news
+    t_sec = best_of(lambda: cv.render_simple_md(news), args.repeat)
+    report("render_simple_md (section)", t_sec, len(lines), len(news.encode("utf-8")))
+
+
+def bench_dates(args) -> None:
+    parse_cached = cv._parse_pubdate_cached
+
+    for label, distinct in (("all distinct", 0), ("{} distinct".format(args.distinct), args.distinct)):
+        dates = synthetic_pubdates(args.count, distinct=distinct)
+        for d in dates:
+            if cv.parse_pubdate_to_tuple(d) != legacy_parse_pubdate_to_tuple(d):
+                raise SystemExit("parse_pubdate_to_tuple differs from the reference for {!r}".format(d))
+
+        def run_cold():
+            parse_cached.cache_clear()
+            for d in dates:
+                cv.parse_pubdate_to_tuple(d)
+
+        t_old = best_of(lambda: [legacy_parse_pubdate_to_tuple(d) for d in dates], args.repeat)
+        t_cold = best_of(run_cold, args.repeat)
+        t_warm = best_of(lambda: [cv.parse_pubdate_to_tuple(d) for d in dates], args.repeat)
+        print("parse_pubdate_to_tuple: {} dates, {} (results identical to reference)".format(len(dates), label))
+        report("reference", t_old, len(dates), 0)
+        report("fast path, cold cache", t_cold, len(dates), 0)
+        report("fast path, warm cache", t_warm, len(dates), 0)
+        print("  speedup: {:.1f}x cold, {:.1f}x warm".format(t_old / t_cold if t_cold else 0.0,
+                                                           t_old / t_warm if t_warm else 0.0))
+        print("")
+
+
+def bench_xpl(args) -> None:
+    if args.fixtures:
+        archive = cv.load_fetch_archive(args.fixtures)
+        pages = [(url, e.get("body", "")) for url, e in sorted(archive.items())
+                 if "xplGlobal.document.metadata=" in e.get("body", "")]
+        if not pages:
+            raise SystemExit("no recorded Xplore pages in {}".format(args.fixtures))
+    else:
+        pages = [("small (8 authors, 20 refs)", synthetic_xplore_page(8, 20)),
+                 ("medium (40 authors, 150 refs)", synthetic_xplore_page(40, 150)),
+                 ("large (300 authors, 1500 refs)", synthetic_xplore_page(300, 1500)),
+                 ("small, 'Early Access' in the chrome", synthetic_xplore_page(8, 20, chrome_note="Early Access"))]
+
+    for label, page in pages:
+        if cv._extract_ieee_metadata_json(page) != legacy_extract_ieee_metadata_json(page):
+            raise SystemExit("_extract_ieee_metadata_json differs from the reference for {}".format(label))
+        start = page.find("{", page.find("xplGlobal.document.metadata="))
+        if cv._find_matching_brace(page, start) != legacy_find_matching_brace(page, start):
+            raise SystemExit("_find_matching_brace differs from the reference for {}".format(label))
+        # Fetches stop after the metadata line: parsing what they read must match a full read
+        streamed = cv._gather_stream([page.encode("utf-8")], cv.IEEE_METADATA_MARKER, cv.FETCH_MAX_BYTES)[0]
+        if cv.parse_ieee_xplore_page(streamed.decode("utf-8"), label) != cv.parse_ieee_xplore_page(page, label):
+            raise SystemExit("parse_ieee_xplore_page on the streamed prefix differs from a full read for {}".format(label))
+        nbytes = len(page.encode("utf-8"))
+        blob = cv._find_matching_brace(page, start) + 1 - start
+        print("{}: page {:.0f} KB, metadata blob {:.0f} KB (results identical to reference and to a full read)".format(
+            label, nbytes / 1024, blob / 1024))
+        t_old = best_of(lambda: legacy_extract_ieee_metadata_json(page), args.repeat)
+        t_scan = best_of(lambda: json.loads(page[start:cv._find_matching_brace(page, start) + 1]), args.repeat)
+        t_new = best_of(lambda: cv._extract_ieee_metadata_json(page), args.repeat)
+        report("reference (char loop)", t_old, 1, nbytes)
+        report("regex brace scan + loads", t_scan, 1, nbytes)
+        report("raw_decode", t_new, 1, nbytes)
+        print("  speedup: {:.1f}x".format(t_old / t_new if t_new else 0.0))
+        print("")
+
+
+def bench_cv(args) -> None:
+    md_text = synthetic_cv_md(args.sections, args.bullets, args.callouts, args.nav_pages,
+                              args.piped, args.url_only)
+    params = {k: getattr(args, k) for k in ("sections", "bullets", "callouts", "nav_pages", "piped", "url_only")}
+    stages: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, seconds: float, items: int, nbytes: int = 0) -> None:
+        stages[name] = {"ms": round(seconds * 1000, 3), "items": items}
+        report(name, seconds, items, nbytes)
+
+    server = xplore_stub_server()
+    origin = cv.IEEE_XPLORE_ORIGIN
+    cwd = os.getcwd()
+    cv.IEEE_XPLORE_ORIGIN = "http://127.0.0.1:{}".format(server.server_port)
+    cv.fetch_interval = 0
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_cv_") as tmp:
+            os.chdir(tmp)
+            with open("CV.md", "w", encoding="utf-8") as f:
+                f.write(md_text)
+            print("synthetic CV.md: {:.1f} KB, {} sections, {} publications ({} URL-only), {} nav pages".format(
+                len(md_text.encode("utf-8")) / 1024, args.sections, args.piped + args.url_only,
+                args.url_only, args.nav_pages))
+
+            n_bytes = len(md_text.encode("utf-8"))
+            record("parse_front_matter", best_of(lambda: cv.parse_front_matter(md_text), args.repeat), 1, n_bytes)
+            _meta, body = cv.parse_front_matter(md_text)
+            secs = cv.split_sections(body)
+            record("split_sections", best_of(lambda: cv.split_sections(body), args.repeat), len(secs), n_bytes)
+
+            def autofill_cold():
+                reset_fetch_caches()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return cv.autofill_publications(md_text)
+
+            cv.bibtex_batch = 25
+            record("autofill_publications (cold)", best_of(autofill_cold, args.repeat), args.url_only)
+            with contextlib.redirect_stdout(io.StringIO()):
+                filled, _changed = cv.autofill_publications(md_text)
+                t_warm = best_of(lambda: cv.autofill_publications(md_text), args.repeat)
+            record("autofill_publications (warm)", t_warm, args.url_only)
+
+            plain = [b for t, b in secs.items() if t != cv.PUB_SECTION_TITLE]
+            record("render_simple_md", best_of(lambda: [cv.render_simple_md(b) for b in plain], args.repeat),
+                   len(plain), sum(len(b.encode("utf-8")) for b in plain))
+            pub_md = cv.split_sections(cv.parse_front_matter(filled)[1]).get(cv.PUB_SECTION_TITLE, "")
+            n_pubs = args.piped + args.url_only
+            cv.highlight_author = SYNTH_HIGHLIGHT
+            record("render_publications", best_of(lambda: cv.render_publications(pub_md), args.repeat), n_pubs)
+            authors = [cv.Publication.from_line(ln.strip()).authors for ln in pub_md.splitlines()
+                       if ln.strip().startswith("-")]
+            record("bold_author_in_authors_str",
+                   best_of(lambda: [cv.bold_author_in_authors_str(a, SYNTH_HIGHLIGHT) for a in authors], args.repeat),
+                   len(authors))
+
+            # Whole builds (forced, metadata from the on-disk cache the first one leaves behind);
+            # render_page is timed from inside build_site.
+            builds, renders = [], []
+            for _ in range(max(1, args.repeat)):
+                reset_fetch_caches()
+                cv._PROFILE_STATS["render_page"] = [0, 0.0]
+                t0 = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cv.build_site(force=True, render_workers=1)
+                builds.append(time.perf_counter() - t0)
+                renders.append(cv._PROFILE_STATS["render_page"][:])
+            del cv._PROFILE_STATS["render_page"]
+            pages = int(renders[0][0])
+            record("render_page", min(r[1] for r in renders), pages)
+            record("build_site (forced)", min(builds), pages)
+    finally:
+        os.chdir(cwd)
+        cv.IEEE_XPLORE_ORIGIN = origin
+        server.shutdown()
+        server.server_close()
+
+    result = {
+        "benchmark": "cv",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "params": params,
+        "repeat": args.repeat,
+        "stages": stages,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print("results written to {}".format(args.json))
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("params") != params:
+            print("note: {} was run with different parameters: {}".format(args.compare, old.get("params")))
+        print("vs {} ({}):".format(args.compare, old.get("revision") or "unknown revision"))
+        for name, st in stages.items():
+            prev = (old.get("stages") or {}).get(name)
+            if not prev:
+                continue
+            ratio = prev["ms"] / st["ms"] if st["ms"] else 0.0
+            print("  {:<28} {:9.2f} ms -> {:9.2f} ms  {:5.2f}x".format(name, prev["ms"], st["ms"], ratio))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for build_CV.py")
+    sub = ap.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("inline", help="md_inline_to_html / render_simple_md throughput")
+    p.add_argument("--lines", type=int, default=5000)
+    p.add_argument("--dense", type=int, default=1000, help="token groups on the token-dense line")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_inline)
+
+    p = sub.add_parser("dates", help="parse_pubdate_to_tuple over synthetic IEEE date strings")
+    p.add_argument("--count", type=int, default=10000)
+    p.add_argument("--distinct", type=int, default=300, help="size of the repeated-date pool")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_dates)
+
+    p = sub.add_parser("xpl", help="_extract_ieee_metadata_json over Xplore pages of several sizes")
+    p.add_argument("--fixtures", default=None, metavar="PATH",
+                   help="use the Xplore pages recorded by 'build_CV.py --record' instead of synthetic ones")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_xpl)
+
+    p = sub.add_parser("cv", help="every build stage on a synthetic CV (URL-only items from a local stub Xplore)")
+    p.add_argument("--sections", type=int, default=8)
+    p.add_argument("--bullets", type=int, default=12, help="bullets per section")
+    p.add_argument("--callouts", type=int, default=1, help="callouts per section")
+    p.add_argument("--nav-pages", type=int, default=3, help="nav pages the sections are spread over")
+    p.add_argument("--piped", type=int, default=120, help="hand-written publications")
+    p.add_argument("--url-only", type=int, default=30, help="URL-only publications resolved via the stub server")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--json", default=None, metavar="PATH", help="write the timings as JSON")
+    p.add_argument("--compare", default=None, metavar="PATH", help="print speedups against an earlier --json file")
+    p.set_defaults(func=bench_cv)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
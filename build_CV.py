@@ -16,14 +16,81 @@ CV.md -> index.html
 from __future__ import annotations
 import os
 import re
+import codecs
+import socket
+import struct
+import zlib
 import html
 import json
+import time
+import hashlib
+import mimetypes
+import argparse
+import http.client
+import threading
+import functools
+import gzip
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from string import Template
-from urllib.parse import urlparse, parse_qsl, urlencode
-from urllib.request import Request, urlopen
+from urllib.parse import unquote, urljoin, urlparse, parse_qsl, urlencode
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
 from urllib.error import URLError, HTTPError
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional, Pattern
+
+
+# -----------------------------
+# Precompiled regexes (compiled once at import; see also _INLINE_* next to md_inline_to_html).
+# Patterns that depend on a runtime value (meta tag names, the highlighted author)
+# are built by the lru_cached helpers further below, i.e. once per value/build.
+# -----------------------------
+_WS_RE = re.compile(r"\s+")
+_YEAR_RE = re.compile(r"(19|20)\d{2}")
+_ISO_DATE_RE = re.compile(r"((?:19|20)\d{2})[./-](\d{1,2})[./-](\d{1,2})")
+_MONTH_YEAR_RE = re.compile(r"\b(January|February|March|April|May|June|July|August|September|October|November|December)\b\s+((?:19|20)\d{2})", flags=re.I)
+_FRONT_MATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", flags=re.S)
+_FRONT_MATTER_RAW_RE = re.compile(r"^(---\s*\n.*?\n---\s*\n)(.*)$", flags=re.S)
+_H2_RE = re.compile(r"^##\s+(.*)$")
+_BARE_DOMAIN_RE = re.compile(r"^[A-Za-z0-9.-]+\.[A-Za-z]{2,}(/.*)?$")
+_BROKEN_LINK_RE = re.compile(r"\]\(\s*\n\s*(https?://[^\s\)]+)\s*\)", flags=re.I)
+_CSS_CLASS_STRIP_RE = re.compile(r"[^a-z0-9_-]+")
+_IEEE_DOC_ID_RE = re.compile(r"/(?:abstract/)?document/(\d+)")
+_CHARSET_RE = re.compile(r"charset=([\w\-]+)")
+_INITIAL_RE = re.compile(r"\b[A-Z]\.")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]+")
+_DOI_RE = re.compile(r'10\.\d{4,9}/[^\s"<>]+')
+_URL_ONLY_ITEM_RE = re.compile(r"^(\s*[-*]\s+)(https?://\S+)\s*$")
+_BULLET_PREFIX_RE = re.compile(r"^\s*[-*]\s+")
+_HTTP_PREFIX_RE = re.compile(r"^https?://", flags=re.I)
+# A <meta ...> tag (quoted attribute values may contain '>'), and one attribute inside it
+_META_TAG_RE = re.compile(r"<meta\b((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>", flags=re.I)
+_TAG_ATTR_RE = re.compile(r"([\w:.-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))")
+_BIB_ENTRY_START_RE = re.compile(r"@\s*([A-Za-z]+)\s*\{\s*([^,\s{}]*)\s*,")
+_BIB_BRACE_RE = re.compile(r"\\.|[{}]", flags=re.S)
+_BIB_DOC_ID_RE = re.compile(r"(?:/document/|arnumber=)(\d+)")
+_BR_TAG_RE = re.compile(r"<br\s*/?>", flags=re.I)
+_BRACE_SCAN_RE = re.compile(r"[{}\"'\\]")
+_AUTHOR_PUNCT_RE = re.compile(r"[\.,;:()\[\]{}]")
+_BODY_INNER_RE = re.compile(r"<body[^>]*>(.*?)</body>", flags=re.I | re.S)
+# xplGlobal.document.metadata line (regex fallback when the JSON does not parse)
+_XPL_TITLE_RES = tuple(re.compile(p) for p in (
+    r'"formulaStrippedArticleTitle"\s*:\s*"([^"]+)"', r'"articleTitle"\s*:\s*"([^"]+)"', r'"title"\s*:\s*"([^"]+)"'))
+_XPL_VENUE_RES = tuple(re.compile(p) for p in (
+    r'"publicationTitle"\s*:\s*"([^"]+)"', r'"conferenceTitle"\s*:\s*"([^"]+)"'))
+_XPL_PUBDATE_RES = tuple(re.compile(p) for p in (
+    r'"publicationDate"\s*:\s*"([^"]+)"', r'"publicationYear"\s*:\s*"?((?:19|20)\d{2})"?'))
+_XPL_DOI_RES = (re.compile(r'"doi"\s*:\s*"([^"]+)"'),)
+_XPL_PTYPE_RES = tuple(re.compile(p) for p in (
+    r'"publicationType"\s*:\s*"([^"]+)"', r'"contentType"\s*:\s*"([^"]+)"'))
+_XPL_CITATION_RES = (re.compile(r'"citationCountPaper"\s*:\s*([0-9]+)'),)
+_XPL_AUTHORS_RE = re.compile(r'"authors"\s*:\s*\[(.*)\]\s*,\s*"')
+_XPL_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
+_XPL_EARLY_ACCESS_RE = re.compile(r'"isEarlyAccess"\s*:\s*(true|false|"true"|"false"|1|0)', flags=re.I)
 
 
 # Keep generated right-pane content fragments in a folder (keeps root tidy)
@@ -32,11 +99,58 @@ CONTENT_DIR = "_content"
 highlight_author = ""
 # Whether to auto-generate local BibTeX files for IEEE URL-only publications
 bibtex_autogen = True
+# Batched IEEE BibTeX (front matter 'bibtex_batch: N'): use the official downloadCitations
+# entries, N documents per request, instead of building entries from scraped metadata (0 = off)
+bibtex_batch = 0
+# Official entries fetched for this build: {doc_id: bibtex}
+IEEE_BIBTEX: Dict[str, str] = {}
 
 # Cache IEEE metadata fetched during autofill so we can sort publications by full date
 # without refetching during HTML rendering.
 PUB_META_CACHE: Dict[str, Dict[str, str]] = {}
 
+_MONTHS_FULL = {m: i for i, m in enumerate(
+    ("january", "february", "march", "april", "may", "june", "july",
+     "august", "september", "october", "november", "december"), start=1)}
+_MONTHS_ABBR = {m[:3]: i for m, i in _MONTHS_FULL.items()}
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_DMY_RE = re.compile(r"^(\d{1,2}) ([A-Za-z]+) (\d{4})$")
+_MDY_RE = re.compile(r"^([A-Za-z]+) (\d{1,2}) (\d{4})$")
+_MY_RE = re.compile(r"^([A-Za-z]+) ((?:19|20)\d{2})$")
+
+
+def _fast_pubdate(ss2: str) -> Optional[Tuple[int, int, int]]:
+    """Hand-written parser for the IEEE forms we actually see.
+
+    Handles "12 March 2024", "12 Mar 2024", "March 12 2024" and "March 2024"
+    (commas already removed). Returns None whenever the string is not one of these
+    *valid* forms, so the caller falls back to the strptime path with unchanged results.
+    """
+    m = _DMY_RE.match(ss2)
+    if m:
+        d, name, y = m.group(1), m.group(2), m.group(3)
+    else:
+        m = _MDY_RE.match(ss2)
+        if m:
+            name, d, y = m.group(1), m.group(2), m.group(3)
+        else:
+            m = _MY_RE.match(ss2)
+            if m:
+                mo = _MONTHS_FULL.get(m.group(1).lower())
+                return (int(m.group(2)), mo, 0) if mo else None
+            return None
+    key = name.lower()
+    mo = _MONTHS_FULL.get(key) or (_MONTHS_ABBR.get(key) if len(key) == 3 else None)
+    if not mo:
+        return None
+    day, year = int(d), int(y)
+    if year < 1000 or day < 1 or day > _DAYS_IN_MONTH[mo - 1]:
+        return None
+    if mo == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    return (year, mo, day)
+
+
 def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
     """Parse IEEE-like publicationDate into (year, month, day)."""
     if not s:
@@ -44,11 +158,16 @@ def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
     ss = str(s).strip()
     if not ss:
         return None
+    return _parse_pubdate_cached(ss)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_pubdate_cached(ss: str) -> Optional[Tuple[int, int, int]]:
     if "early access" in ss.lower():
         return None
 
     # ISO-ish
-    m = re.search(r"((?:19|20)\d{2})[./-](\d{1,2})[./-](\d{1,2})", ss)
+    m = _ISO_DATE_RE.search(ss)
     if m:
         try:
             y = int(m.group(1))
@@ -59,7 +178,12 @@ def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
             pass
 
     # Normalize commas and multiple spaces
-    ss2 = re.sub(r"\s+", " ", ss.replace(",", " ")).strip()
+    ss2 = _WS_RE.sub(" ", ss.replace(",", " ")).strip()
+
+    # Fast path for the common IEEE forms; strptime below is the last resort
+    fast = _fast_pubdate(ss2)
+    if fast:
+        return fast
 
     fmts = [
         "%d %B %Y",
@@ -77,7 +201,7 @@ def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
             continue
 
     # Month + year only (day=0)
-    m2 = re.search(r"\b(January|February|March|April|May|June|July|August|September|October|November|December)\b\s+((?:19|20)\d{2})", ss2, flags=re.I)
+    m2 = _MONTH_YEAR_RE.search(ss2)
     if m2:
         try:
             dt = datetime.strptime(m2.group(0).title(), "%B %Y")
@@ -86,7 +210,7 @@ def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
             pass
 
     # Fallback: any year in string
-    m3 = re.search(r"(19|20)\d{2}", ss2)
+    m3 = _YEAR_RE.search(ss2)
     if m3:
         try:
             return (int(m3.group(0)), 0, 0)
@@ -96,12 +220,53 @@ def parse_pubdate_to_tuple(s: str) -> Optional[Tuple[int, int, int]]:
     return None
 # Put auto-generated BibTeX files here
 BIB_DIR = "bibtex"
+# Fingerprinted CSS/JS bundle (front matter 'assets: external'); names change with content,
+# so the web server can send them with a long max-age / immutable Cache-Control.
+ASSET_DIR = "assets"
+# Build caches that should survive between runs (CI can persist this folder)
+CACHE_DIR = ".cv_cache"
+# On-disk IEEE metadata cache, keyed by normalized https://ieeexplore.ieee.org/document/<id> URL
+META_CACHE_PATH = os.path.join(CACHE_DIR, "ieee_meta.json")
+# Seconds a cached entry is trusted before it is revalidated with a conditional GET
+# (can be set via front matter 'meta_cache_ttl_days'; 0 = always revalidate)
+meta_cache_ttl = 7 * 24 * 3600
+# Entries loaded from / saved to META_CACHE_PATH:
+#   {url: {"meta": {...}, "fetched_at": epoch, "etag": "...", "last_modified": "..."}}
+META_DISK_CACHE: Dict[str, dict] = {}
+# Record/replay of fetch_text responses ('--record' / '--offline'; '--fixtures PATH' overrides the path)
+FETCH_ARCHIVE_PATH = os.path.join(CACHE_DIR, "fetch_archive.json.gz")
+# "live" (network), "record" (network + save responses) or "offline" (replay only, never touch the network)
+fetch_mode = "live"
+# Incremental builds: hashes of every page's inputs from the last run
+BUILD_MANIFEST_PATH = os.path.join(CACHE_DIR, "build_manifest.json")
+# Concurrent metadata fetching during autofill (front matter: fetch_workers / fetch_per_host / fetch_interval)
+fetch_workers = 4
+# Max simultaneous requests to one host, and min seconds between two request starts to that host
+fetch_per_host = 2
+fetch_interval = 0.25
+# Retries on 429/5xx/connection errors, and the base of the exponential backoff in seconds
+# (front matter: fetch_retries / fetch_backoff)
+fetch_retries = 3
+fetch_backoff = 0.5
+# Origin IEEE Xplore requests are sent to (scheme://host[:port]). Override it to go through a
+# mirror, a caching proxy or a local stub (bench_CV.py does this); only the request changes:
+# cache keys, CV.md writeback and rendered links keep the canonical https://ieeexplore.ieee.org URLs.
+IEEE_XPLORE_ORIGIN = "https://ieeexplore.ieee.org"
 # Section name to auto-fill (must match your heading)
 PUB_SECTION_TITLE = "Selected Publications\部分成果"
 
 
+def ieee_request_url(url: str) -> str:
+    """An ieeexplore.ieee.org URL as it is actually requested (on IEEE_XPLORE_ORIGIN)."""
+    if IEEE_XPLORE_ORIGIN == "https://ieeexplore.ieee.org":
+        return url
+    pu = urlparse(url)
+    return IEEE_XPLORE_ORIGIN.rstrip("/") + (pu.path or "/") + ("?" + pu.query if pu.query else "")
+
+
 def ieee_bibtex_export_url(doc_id: str) -> str:
-    """Return an online BibTeX export URL for an IEEE Xplore document id."""
+    """Return an online BibTeX export URL for an IEEE Xplore document id
+    (or several, comma-separated: the endpoint answers with one entry each)."""
     doc_id = (doc_id or "").strip()
     if not doc_id:
         return ""
@@ -280,6 +445,7 @@ a:hover{ text-decoration:underline; }
 .wechat a{ text-decoration:none; }
 .wechat img{
   width:100%;
+  height:auto;
   max-width:210px;
   display:block;
   margin:10px auto 6px;
@@ -489,14 +655,9 @@ html.cv-layout-2 .sidebar{ position:sticky; position:-webkit-sticky; top:18px; }
 """
 
 
-HTML_DOC = Template("""<!doctype html>
-<html lang="zh-CN">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1, minimum-scale=0.25, maximum-scale=5, user-scalable=yes, viewport-fit=cover" />
-
-<script>
-/* Mobile viewport fix */
+# Boot scripts. Inline (default) they sit in <head> as before; with 'assets: external'
+# they are bundled into one fingerprinted file under ASSET_DIR (see write_asset_bundle).
+MOBILE_VIEWPORT_JS = r"""/* Mobile viewport fix */
 (function(){
   var ua = navigator.userAgent || "";
   var isMobile = /Mobi|Android|iPhone|iPad|iPod|Mobile|MicroMessenger/i.test(ua);
@@ -526,14 +687,9 @@ HTML_DOC = Template("""<!doctype html>
     de.style.width = "";
   }catch(e){}
 })();
-</script>
-  <title>$PAGE_TITLE</title>
-  <meta name="description" content="CV" />
-  <style>
-$STYLE
-  </style>
-<script>
-(function(){
+"""
+
+ZOOM_LAYOUT_JS = r"""(function(){
   /* FIX: Robust Zoom Persistence to prevent jumping */
   var KEY_ZOOM = "cv_zoom_desired";
   var KEY_LAYOUT = "cv_layout_mode";
@@ -609,14 +765,27 @@ $STYLE
 
   window.addEventListener('pagehide', function(){ ssSet(KEY_ZOOM, desired); });
 })();
-</script>
+"""
+
+
+HTML_DOC = Template("""<!doctype html>
+<html lang="zh-CN">
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1, minimum-scale=0.25, maximum-scale=5, user-scalable=yes, viewport-fit=cover" />
+
+$MOBILE_SCRIPT
+  <title>$PAGE_TITLE</title>
+  <meta name="description" content="CV" />
+$STYLE_BLOCK
+$ZOOM_SCRIPT
 </head>
 
 <body>
   <div class="wrap">
     <aside class="card sidebar">
       <div class="profile">
-        <div class="avatar"><img src="$AVATAR" alt="avatar" /></div>
+        <div class="avatar"><img src="$AVATAR" alt="avatar"$AVATAR_ATTRS /></div>
         <div>
           <h2 class="name">$NAME</h2>
           <p class="title">$ROLE</p>
@@ -660,13 +829,476 @@ $SECTIONS
 """)
 
 
+_ASSET_NAME_RE = re.compile(r"^(cv\.[0-9a-f]{10}\.(?:css|js))(?:\.gz|\.br)?$")
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", flags=re.S)
+# Top-level rules kept inline as critical CSS (page frame, sidebar, layout lock)
+CRITICAL_CSS_PREFIXES = (":root", "*", "html", "body", ".wrap", ".card", ".sidebar", "@media")
+
+
+def split_css_rules(css: str) -> List[Tuple[str, str]]:
+    """Split a stylesheet into top-level (selector, rule_text) pairs; comments are dropped."""
+    css = _CSS_COMMENT_RE.sub("", css)
+    rules: List[Tuple[str, str]] = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(css):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rule = css[start:i + 1].strip()
+                if rule:
+                    rules.append((rule.split("{", 1)[0].strip(), rule))
+                start = i + 1
+    return rules
+
+
+def critical_css(css: str = STYLE) -> str:
+    """The subset of STYLE that paints the page frame (kept inline with 'critical_css: true')."""
+    return "\n".join(rule for sel, rule in split_css_rules(css) if sel.startswith(CRITICAL_CSS_PREFIXES))
+
+
+def write_asset_bundle(asset_dir: str = ASSET_DIR, minify: bool = False,
+                       out: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+    """Write STYLE and the boot scripts once as cv.<hash>.css / cv.<hash>.js.
+
+    Older bundles in `asset_dir` are removed. Returns (css_path, js_path).
+    With `out` (preview server) nothing is written: {path: text} goes into `out` instead.
+    """
+    css = STYLE.strip("\n") + "\n"
+    js = MOBILE_VIEWPORT_JS + ZOOM_LAYOUT_JS
+    if minify:
+        css = minify_css(css) + "\n"
+        js = minify_js(js) + "\n"
+    paths = []
+    for ext, text in (("css", css), ("js", js)):
+        path = os.path.join(asset_dir, "cv.{}.{}".format(content_hash(text)[:10], ext))
+        if out is not None:
+            out[path.replace(os.sep, "/")] = text
+        elif write_text_if_changed(path, text):
+            print('📦 生成资源：{}'.format(path))
+        paths.append(path)
+    if out is not None:
+        return paths[0], paths[1]
+    keep = {os.path.basename(p) for p in paths}
+    for fn in os.listdir(asset_dir):
+        m = _ASSET_NAME_RE.match(fn)
+        if m and m.group(1) not in keep:
+            try:
+                os.remove(os.path.join(asset_dir, fn))
+            except OSError:
+                pass
+    return paths[0], paths[1]
+
+
+def page_head_blocks(out_filename: str, bundle: Optional[Tuple[str, str]] = None,
+                     critical: bool = False) -> Dict[str, str]:
+    """$MOBILE_SCRIPT / $STYLE_BLOCK / $ZOOM_SCRIPT for one page.
+
+    Without a bundle everything is inlined (the classic single-file page). With a
+    bundle the page links the fingerprinted files, relative to its own folder;
+    the boot script stays in the same place in <head> so it still runs before paint.
+    """
+    if not bundle:
+        return {
+            "MOBILE_SCRIPT": "<script>\n" + MOBILE_VIEWPORT_JS + "</script>",
+            "STYLE_BLOCK": "  <style>\n" + STYLE.strip("\n") + "\n  </style>",
+            "ZOOM_SCRIPT": "<script>\n" + ZOOM_LAYOUT_JS + "</script>",
+        }
+    base = os.path.dirname(out_filename) or "."
+
+    def rel(path: str) -> str:
+        return os.path.relpath(path, base).replace(os.sep, "/")
+
+    css_path, js_path = bundle
+    style_block = '  <link rel="stylesheet" href="{}" />'.format(esc(rel(css_path)))
+    if critical:
+        style_block = "  <style>\n" + critical_css() + "\n  </style>\n" + style_block
+    return {
+        "MOBILE_SCRIPT": '<script src="{}"></script>'.format(esc(rel(js_path))),
+        "STYLE_BLOCK": style_block,
+        "ZOOM_SCRIPT": "",
+    }
+
+
+# -----------------------------
+# Images (front matter 'responsive_images: true'): intrinsic width/height + resized srcset variants
+# -----------------------------
+# Generated variants only: everything in here may be pruned, so source images must live elsewhere
+IMAGE_DIR = os.path.join(ASSET_DIR, "img", "_gen")
+IMAGE_CACHE_PATH = os.path.join(CACHE_DIR, "images.json")
+
+# Rendered CSS width of each image slot; variants are made at 1x/2x/3x of it.
+IMAGE_SLOTS = {
+    "avatar": (76, "76px"),
+    "wechat_qr": (210, "210px"),
+    # Full-width CSS background (front matter 'banner_image'): 640/1280/1920 px variants
+    "banner": (640, "100vw"),
+}
+# <stem>.<10-hex source hash>.<w>w<ext>, as written by prepare_image
+_IMAGE_VARIANT_RE = re.compile(r"^.+\.[0-9a-f]{10}\.\d+w\.[A-Za-z0-9]+$")
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from the PNG / GIF / JPEG / WebP header, or None. No third-party modules."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(32)
+            if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                chunk = head[12:16]
+                if chunk == b"VP8 ":
+                    w, h = struct.unpack("<HH", head[26:30])
+                    return w & 0x3FFF, h & 0x3FFF
+                if chunk == b"VP8L":
+                    b = head[21:25]
+                    w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+                    h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+                    return w, h
+                if chunk == b"VP8X":
+                    return (1 + int.from_bytes(head[24:27], "little"),
+                            1 + int.from_bytes(head[27:30], "little"))
+                return None
+            if head[:2] == b"\xff\xd8":
+                f.seek(2)
+                while True:
+                    byte = f.read(1)
+                    while byte and byte != b"\xff":
+                        byte = f.read(1)
+                    while byte == b"\xff":
+                        byte = f.read(1)
+                    if not byte:
+                        return None
+                    marker = byte[0]
+                    if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                        continue
+                    seg_len = struct.unpack(">H", f.read(2))[0]
+                    if marker in _JPEG_SOF_MARKERS:
+                        h, w = struct.unpack(">xHH", f.read(5))
+                        return w, h
+                    f.seek(seg_len - 2, 1)
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def local_image_path(src: str) -> str:
+    """Filesystem path for a site-relative image src ("./x", "/x", "../x"), "" for remote URLs."""
+    src = (src or "").strip()
+    if not src or urlparse(src).scheme:
+        return ""
+    path = os.path.normpath(src.split("?", 1)[0].split("#", 1)[0].lstrip("/"))
+    return path if os.path.isfile(path) else ""
+
+
+def load_image_cache(path: str = IMAGE_CACHE_PATH) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    entries = data.get("entries") if isinstance(data, dict) else None
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_image_cache(entries: Dict[str, dict], path: str = IMAGE_CACHE_PATH) -> None:
+    content = json.dumps({"version": 1, "entries": entries}, ensure_ascii=False, indent=1, sort_keys=True) + "\n"
+    try:
+        write_text_if_changed(path, content)
+    except OSError as e:
+        print("⚠️ 写入图片缓存失败：{}".format(e))
+
+
+def _pillow_available() -> bool:
+    try:
+        import PIL  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _resize_image(src_path: str, dst_path: str, width: int, height: int) -> bool:
+    """Write a resized copy with Pillow (optional dependency). False if Pillow is missing or fails."""
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
+        return False
+    os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+    root, ext = os.path.splitext(dst_path)
+    tmp = "{}.tmp-{}{}".format(root, os.getpid(), ext)
+    try:
+        with Image.open(src_path) as im:
+            fmt = im.format
+            out = im.resize((width, height), Image.LANCZOS)
+            if fmt == "JPEG":
+                if out.mode not in ("RGB", "L"):
+                    out = out.convert("RGB")
+                out.save(tmp, fmt, quality=82, optimize=True, progressive=True)
+            else:
+                out.save(tmp, fmt, optimize=True)
+        os.replace(tmp, dst_path)
+        return True
+    except Exception as e:
+        print("⚠️ 生成缩略图失败：{} ({})".format(src_path, e))
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def prepare_image(src: str, slot_width: int, cache: Dict[str, dict], generate: bool = True) -> Optional[dict]:
+    """Intrinsic size and 1x/2x/3x variants of a local image.
+
+    Returns {"width", "height", "variants": [[w, path], ...]} or None for remote/unreadable images.
+    Variants are named <stem>.<source hash>.<w>w<ext> under IMAGE_DIR, so an unchanged source
+    is never re-encoded; `cache` remembers (mtime, size) per path and slot so reruns do not even hash it.
+    With `generate=False` (preview builds) missing variants are not written, only existing ones used.
+    """
+    path = local_image_path(src)
+    if not path:
+        return None
+    st = os.stat(path)
+    key = "{}@{}".format(path, slot_width)
+    entry = cache.get(key)
+    if not (entry and entry.get("mtime") == st.st_mtime and entry.get("size") == st.st_size
+            and all(os.path.isfile(v) for _w, v in entry.get("variants", []))
+            and (entry.get("resized") or not _pillow_available())):
+        dims = image_size(path)
+        if not dims:
+            return None
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:10]
+        width, height = dims
+        stem, ext = os.path.splitext(os.path.basename(path))
+        variants = []
+        for scale in (1, 2, 3):
+            w = slot_width * scale
+            if w >= width:
+                break
+            out = os.path.join(IMAGE_DIR, "{}.{}.{}w{}".format(stem, digest, w, ext.lower()))
+            if os.path.isfile(out) or (generate and _resize_image(path, out, w, max(1, round(height * w / width)))):
+                variants.append([w, out])
+        entry = {"mtime": st.st_mtime, "size": st.st_size, "hash": digest, "width": width,
+                 "height": height, "variants": variants, "resized": generate and _pillow_available()}
+        cache[key] = entry
+    return entry
+
+
+def img_attrs(info: Optional[dict], src: str, out_filename: str, sizes: str) -> str:
+    """Extra <img> attributes for one page: width/height, plus srcset/sizes if variants exist."""
+    if not info:
+        return ""
+    attrs = ' width="{}" height="{}"'.format(info["width"], info["height"])
+    if info.get("variants"):
+        base = os.path.dirname(out_filename) or "."
+        cands = ["{} {}w".format(esc(os.path.relpath(p, base).replace(os.sep, "/")), w) for w, p in info["variants"]]
+        cands.append("{} {}w".format(esc(src), info["width"]))
+        attrs += ' srcset="{}" sizes="{}"'.format(", ".join(cands), esc(sizes))
+    return attrs
+
+
+# The site stylesheet whose #banner rule uses 'banner_image' as background (front matter 'banner_css').
+# Its own rule is left alone; a generated block at the end of the file overrides the image per viewport.
+BANNER_CSS_PATH = os.path.join("css", "style.css")
+BANNER_SELECTOR = "#banner"
+_BANNER_CSS_BEGIN = "/* build_CV: responsive banner (generated) */"
+_BANNER_CSS_END = "/* build_CV: end responsive banner */"
+_BANNER_CSS_RE = re.compile(r"\n*" + re.escape(_BANNER_CSS_BEGIN) + r".*?" + re.escape(_BANNER_CSS_END) + r"\n?", flags=re.S)
+
+
+def banner_css(info: Optional[dict], src_path: str, css_path: str) -> str:
+    """@media rules that serve the banner variants as BANNER_SELECTOR's background: for a viewport up
+    to a variant's width that variant at 1x and the next larger one at 2x. "" without variants."""
+    if not info or not info.get("variants"):
+        return ""
+    base = os.path.dirname(css_path) or "."
+
+    def url(p: str) -> str:
+        return 'url("{}")'.format(os.path.relpath(p, base).replace(os.sep, "/"))
+    cands = [(w, p) for w, p in info["variants"]] + [(info["width"], src_path)]
+    rules = [_BANNER_CSS_BEGIN]
+    # Widest breakpoint first: of several matching max-width queries the last (narrowest) wins
+    for i in range(len(cands) - 2, -1, -1):
+        w, p = cands[i]
+        sets = "{} 1x, {} 2x".format(url(p), url(cands[i + 1][1]))
+        rules.append("@media (max-width: {}px) {{\n  {} {{\n    background-image: {};\n"
+                     "    background-image: -webkit-image-set({});\n    background-image: image-set({});\n  }}\n}}"
+                     .format(w, BANNER_SELECTOR, url(p), sets, sets))
+    rules.append(_BANNER_CSS_END)
+    return "\n".join(rules) + "\n"
+
+
+def write_banner_css(css_path: str, block: str) -> bool:
+    """Replace (or, with block "", remove) the generated banner block of `css_path`. True if written."""
+    try:
+        with open(css_path, "r", encoding="utf-8") as f:
+            old = f.read()
+    except OSError:
+        return False
+    if not block and not _BANNER_CSS_RE.search(old):
+        return False
+    rest = _BANNER_CSS_RE.sub("\n", old)
+    new = rest.rstrip("\n") + "\n" + ("\n" + block if block else "")
+    return write_text_if_changed(css_path, new)
+
+
+# -----------------------------
+# Minification (front matter 'minify: true'); dependency-free and conservative
+# -----------------------------
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON_RE = re.compile(r":\s+")
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", flags=re.S)
+_HTML_WS_RE = re.compile(r"[ \t\r\n\f]+")
+_HTML_BLOCK_TAG_RE = re.compile(
+    r"\s*(</?(?:!doctype|html|head|body|meta|link|title|script|style|div|section|main|aside|nav|header|footer|"
+    r"ul|ol|li|p|h[1-6]|br|hr|table|thead|tbody|tr|td|th|form|pre|blockquote)\b[^>]*>)\s*", flags=re.I)
+_HTML_VOID_CLOSE_RE = re.compile(r"\s*/>")
+_HTML_TYPE_ATTR_RE = re.compile(r'\s+type="text/(?:javascript|css)"', flags=re.I)
+_HTML_RAW_RE = re.compile(r"(<(script|style|pre|textarea|code)\b[^>]*>)(.*?)(</\2\s*>)", flags=re.I | re.S)
+# A start tag (quoted values may contain '>') and the quoted attribute values inside it
+_HTML_START_TAG_RE = re.compile(r"""<[A-Za-z][^\s/>]*(?:[^>"']|"[^"]*"|'[^']*')*>""")
+_HTML_ATTR_VALUE_RE = re.compile(r"""=\s*("[^"]*"|'[^']*')""")
+_MINIFY_KEPT_RE = re.compile("\x00(\\d+)\x00")
+_EXT_CONTENT_OPEN_RE = re.compile(r'<div class="ext-content">')
+_DIV_TAG_RE = re.compile(r"<(/?)div\b[^>]*>", flags=re.I)
+_JS_REGEX_PREV = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and optional whitespace from a stylesheet."""
+    css = _CSS_COMMENT_RE.sub("", css or "")
+    css = _HTML_WS_RE.sub(" ", css)
+    css = _CSS_PUNCT_RE.sub(r"\1", css)
+    css = _CSS_COLON_RE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """Strip comments and indentation from a script, keeping line breaks (no ASI surprises).
+
+    String, template and regex literals are copied verbatim.
+    """
+    out: List[str] = []
+    i, n = 0, len(js or "")
+    prev = ""  # last significant character emitted
+    while i < n:
+        ch = js[i]
+        nxt = js[i + 1] if i + 1 < n else ""
+        if ch in "\"'`":
+            j = i + 1
+            while j < n and js[j] != ch:
+                j += 2 if js[j] == "\\" else 1
+            out.append(js[i:j + 1])
+            i, prev = j + 1, ch
+            continue
+        if ch == "/" and nxt == "/":
+            while i < n and js[i] != "\n":
+                i += 1
+            continue
+        if ch == "/" and nxt == "*":
+            end = js.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch == "/" and prev in _JS_REGEX_PREV:
+            j, in_class = i + 1, False
+            while j < n and js[j] != "\n":
+                c = js[j]
+                if c == "\\":
+                    j += 2
+                    continue
+                if c == "[":
+                    in_class = True
+                elif c == "]":
+                    in_class = False
+                elif c == "/" and not in_class:
+                    break
+                j += 1
+            out.append(js[i:j + 1])
+            i, prev = j + 1, "/"
+            continue
+        out.append(ch)
+        if not ch.isspace():
+            prev = ch
+        i += 1
+    lines = (ln.strip() for ln in "".join(out).split("\n"))
+    return "\n".join(ln for ln in lines if ln)
+
+
+def _ext_content_spans(page: str) -> List[Tuple[int, int]]:
+    """(start, end) of the inner HTML of every <div class="ext-content"> (nested divs balanced)."""
+    spans = []
+    for m in _EXT_CONTENT_OPEN_RE.finditer(page):
+        if spans and m.start() < spans[-1][1]:
+            continue
+        depth = 1
+        for t in _DIV_TAG_RE.finditer(page, m.end()):
+            depth += -1 if t.group(1) else 1
+            if depth == 0:
+                spans.append((m.end(), t.start()))
+                break
+    return spans
+
+
+def minify_html(page: str) -> str:
+    """Collapse whitespace between tags, drop comments and redundant attributes.
+
+    Left untouched: the bodies of <pre>, <textarea>, <code> and .ext-content (external
+    HTML wrapped by shell pages), and quoted attribute values (title, content, data-*).
+    <script>/<style> bodies go through minify_js/minify_css.
+    """
+    kept: List[str] = []
+
+    def keep(text: str) -> str:
+        kept.append(text)
+        return "\x00{}\x00".format(len(kept) - 1)
+
+    parts = []
+    last = 0
+    for a, b in _ext_content_spans(page):
+        parts.append(page[last:a])
+        parts.append(keep(page[a:b]))
+        last = b
+    parts.append(page[last:])
+    page = "".join(parts)
+
+    def raw_repl(m: re.Match) -> str:
+        tag = m.group(2).lower()
+        body = m.group(3)
+        if tag == "script":
+            body = minify_js(body)
+        elif tag == "style":
+            body = minify_css(body)
+        return m.group(1) + keep(body) + m.group(4)
+
+    page = _HTML_RAW_RE.sub(raw_repl, page)
+    page = _HTML_COMMENT_RE.sub("", page)
+    page = _HTML_TYPE_ATTR_RE.sub("", page)
+
+    def attr_repl(m: re.Match) -> str:
+        value = m.group(1)
+        return m.group(0) if not _HTML_WS_RE.search(value) else "=" + keep(value)
+
+    page = _HTML_START_TAG_RE.sub(lambda m: _HTML_ATTR_VALUE_RE.sub(attr_repl, m.group(0)), page)
+    page = _HTML_VOID_CLOSE_RE.sub(">", page)
+    page = _HTML_WS_RE.sub(" ", page)
+    page = _HTML_BLOCK_TAG_RE.sub(r"\1", page).strip()
+    return _MINIFY_KEPT_RE.sub(lambda m: kept[int(m.group(1))], page) + "\n"
+
+
 def parse_front_matter(md_text: str) -> Tuple[Dict[str, object], str]:
     """Parse a small subset of YAML front matter.
 
     Supported:
       - key: value (single line)
       - tags: [a, b, c]
-      - nav/nav_items/navbar: JSON array (single-line OR multi-line between [ ... ])
+      - nav/nav_items/navbar, budgets: JSON array (single-line OR multi-line between [ ... ])
+        (budgets may also be one rule as a plain scalar; a budgets [ ... ] that is not valid JSON is an error)
 
     (We keep it dependency-free: no PyYAML.)
     """
@@ -677,7 +1309,7 @@ def parse_front_matter(md_text: str) -> Tuple[Dict[str, object], str]:
     if not text.startswith("---"):
         return meta, md_text
 
-    m = re.match(r"^---\s*\n(.*?)\n---\s*\n(.*)$", text, flags=re.S)
+    m = _FRONT_MATTER_RE.match(text)
     if not m:
         return meta, md_text
 
@@ -705,7 +1337,7 @@ def parse_front_matter(md_text: str) -> Tuple[Dict[str, object], str]:
             i += 1
             continue
 
-        if key in ("nav", "navbar", "nav_items"):
+        if key in ("nav", "navbar", "nav_items", "budgets"):
             # Allow:
             #   nav: [{...},{...}]
             # as well as multi-line:
@@ -728,6 +1360,20 @@ def parse_front_matter(md_text: str) -> Tuple[Dict[str, object], str]:
             else:
                 i += 1
 
+            if key == "budgets":
+                # A CI gate must not be switched off by a typo: a single rule may be written as a
+                # plain scalar, but a [...] list that is not valid JSON is an error.
+                if not raw.startswith("["):
+                    rule = raw.strip('"').strip("'").strip()
+                    meta[key] = [rule] if rule else []
+                    continue
+                try:
+                    parsed = json.loads(raw)
+                except Exception as e:
+                    raise SystemExit("front matter 'budgets' 不是合法的 JSON 数组：{}".format(e))
+                meta[key] = parsed if isinstance(parsed, list) else [parsed]
+                continue
+
             try:
                 parsed = json.loads(raw)
                 meta[key] = parsed if isinstance(parsed, list) else []
@@ -763,11 +1409,11 @@ def sanitize_url(u: str) -> str:
     u = u.strip().strip('"').strip("'")
 
     # Basic whitespace check (href cannot contain spaces safely)
-    if re.search(r"\s", u):
+    if _WS_RE.search(u):
         # Markdown links may include an optional title: (url "title").
         # In that case, keep only the first token as URL.
         u = u.split()[0].strip()
-        if not u or re.search(r"\s", u):
+        if not u or _WS_RE.search(u):
             return ""
 
     p = urlparse(u)
@@ -781,12 +1427,20 @@ def sanitize_url(u: str) -> str:
         return u
 
     # If someone writes [text](example.com) (no scheme), treat it as https.
-    if re.match(r"^[A-Za-z0-9.-]+\.[A-Za-z]{2,}(/.*)?$", u):
+    if _BARE_DOMAIN_RE.match(u):
         return "https://" + u
 
     return ""
 
 
+_INLINE_CODE_RE = re.compile(r"`([^`\n]+)`")
+_INLINE_LINK_RE = re.compile(r"(?<!!)\[(?P<label>[^\]\n]+)\]\((?P<url>[^\)\n]+)\)")
+_INLINE_URL_RE = re.compile(r"(?<![A-Za-z0-9_])https?://[^ \t\r\n<>\"']+", flags=re.I)
+_INLINE_BOLD_RE = re.compile(r"(\*\*|__)(?P<txt>[^\n]+?)\1")
+_INLINE_HI_RE = re.compile(r"==(?P<txt>[^\n]+?)==")
+_INLINE_TOKEN_RE = re.compile(r"@@CVTOK([1-9][0-9]*)@@")
+
+
 def md_inline_to_html(text: str) -> str:
     """Inline markdown (safe).
 
@@ -798,94 +1452,106 @@ def md_inline_to_html(text: str) -> str:
       - `==highlight==`
 
     Everything else is HTML-escaped.
+
+    Constructs are recognized in priority order (code, links, bare URLs, bold,
+    highlight); each one is swapped for an opaque `@@CVTOK{n}@@` token so later
+    rules cannot see inside it. Rules whose marker does not occur are skipped,
+    and all tokens are expanded in one final scan.
     """
     s = text or ""
     if not s:
         return ""
 
-    token_map = {}
-    token_i = 0
+    snippets: List[str] = []
 
     def _new_token(html_snip: str) -> str:
-        nonlocal token_i
-        token_i += 1
-        tok = f"@@CVTOK{token_i}@@"
-        token_map[tok] = html_snip
-        return tok
+        snippets.append(html_snip)
+        return f"@@CVTOK{len(snippets)}@@"
 
     # 0) Inline code (protect first)
-    code_pat = re.compile(r"`([^`\n]+)`")
-
-    def _code_repl(m: re.Match) -> str:
-        inner = m.group(1)
-        return _new_token(f"<code>{html.escape(inner, quote=True)}</code>")
+    if "`" in s:
+        def _code_repl(m: re.Match) -> str:
+            inner = m.group(1)
+            return _new_token(f"<code>{html.escape(inner, quote=True)}</code>")
 
-    s0 = code_pat.sub(_code_repl, s)
+        s = _INLINE_CODE_RE.sub(_code_repl, s)
 
     # 1) Markdown links: [label](url)
-    link_pat = re.compile(r"(?<!!)\[(?P<label>[^\]\n]+)\]\((?P<url>[^\)\n]+)\)")
-
-    def _link_repl(m: re.Match) -> str:
-        label = (m.group("label") or "").strip()
-        raw = (m.group("url") or "").strip()
-        url = raw.split()[0].strip() if raw else ""
-        safe = sanitize_url(url)
-        if not (label and safe):
-            return m.group(0)
-        href = html.escape(safe, quote=True)
-        lab = html.escape(label, quote=True)
-        a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
-        return _new_token(a)
-
-    s1 = link_pat.sub(_link_repl, s0)
+    if "](" in s:
+        def _link_repl(m: re.Match) -> str:
+            label = (m.group("label") or "").strip()
+            raw = (m.group("url") or "").strip()
+            url = raw.split()[0].strip() if raw else ""
+            safe = sanitize_url(url)
+            if not (label and safe):
+                return m.group(0)
+            href = html.escape(safe, quote=True)
+            lab = html.escape(label, quote=True)
+            a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
+            return _new_token(a)
+
+        s = _INLINE_LINK_RE.sub(_link_repl, s)
 
     # 2) Bare URLs
-    url_pat = re.compile(r"(?<![A-Za-z0-9_])https?://[^ \t\r\n<>\"']+", flags=re.I)
-
-    def _url_repl(m: re.Match) -> str:
-        raw = m.group(0)
-        url = raw
-        trail = ""
-        while url and url[-1] in ".,;:!?)]}\"'":
-            trail = url[-1] + trail
-            url = url[:-1]
-        safe = sanitize_url(url)
-        if not safe:
-            return raw
-        href = html.escape(safe, quote=True)
-        lab = html.escape(url, quote=True)
-        a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
-        return _new_token(a) + trail
-
-    s2 = url_pat.sub(_url_repl, s1)
+    if "://" in s:
+        def _url_repl(m: re.Match) -> str:
+            raw = m.group(0)
+            url = raw
+            trail = ""
+            while url and url[-1] in ".,;:!?)]}\"'":
+                trail = url[-1] + trail
+                url = url[:-1]
+            safe = sanitize_url(url)
+            if not safe:
+                return raw
+            href = html.escape(safe, quote=True)
+            lab = html.escape(url, quote=True)
+            a = f"<a href=\"{href}\" target=\"_blank\" rel=\"noopener noreferrer\">{lab}</a>"
+            return _new_token(a) + trail
+
+        s = _INLINE_URL_RE.sub(_url_repl, s)
 
     # 3) Bold: **text** or __text__
-    bold_pat = re.compile(r"(\*\*|__)(?P<txt>[^\n]+?)\1")
-
-    def _bold_repl(m: re.Match) -> str:
-        inner = (m.group("txt") or "").strip()
-        if not inner:
-            return m.group(0)
-        return _new_token(f"<strong>{html.escape(inner, quote=True)}</strong>")
+    if "**" in s or "__" in s:
+        def _bold_repl(m: re.Match) -> str:
+            inner = (m.group("txt") or "").strip()
+            if not inner:
+                return m.group(0)
+            return _new_token(f"<strong>{html.escape(inner, quote=True)}</strong>")
 
-    s3 = bold_pat.sub(_bold_repl, s2)
+        s = _INLINE_BOLD_RE.sub(_bold_repl, s)
 
     # 4) Highlight: ==text==
-    hi_pat = re.compile(r"==(?P<txt>[^\n]+?)==")
-
-    def _hi_repl(m: re.Match) -> str:
-        inner = (m.group("txt") or "").strip()
-        if not inner:
+    if "==" in s:
+        def _hi_repl(m: re.Match) -> str:
+            inner = (m.group("txt") or "").strip()
+            if not inner:
+                return m.group(0)
+            return _new_token(f"<mark class=\"hl\">{html.escape(inner, quote=True)}</mark>")
+
+        s = _INLINE_HI_RE.sub(_hi_repl, s)
+
+    escaped = html.escape(s, quote=True)
+    if not snippets:
+        return escaped
+
+    # Expand tokens in a single scan. A token's snippet may itself contain earlier
+    # tokens (e.g. a link inside bold), so snippets are expanded recursively, but
+    # only with tokens created before them -- the same result as replacing the
+    # tokens one by one in reverse creation order.
+    def _expand(t: str, limit: int) -> str:
+        if "@@CVTOK" not in t:
+            return t
+
+        def _tok_repl(m: re.Match) -> str:
+            n = int(m.group(1))
+            if n < limit:
+                return _expand(snippets[n - 1], n)
             return m.group(0)
-        return _new_token(f"<mark class=\"hl\">{html.escape(inner, quote=True)}</mark>")
 
-    s4 = hi_pat.sub(_hi_repl, s3)
+        return _INLINE_TOKEN_RE.sub(_tok_repl, t)
 
-    escaped = html.escape(s4, quote=True)
-    # Restore tokens in reverse insertion order to support nesting
-    for tok in reversed(list(token_map.keys())):
-        escaped = escaped.replace(tok, token_map[tok])
-    return escaped
+    return _expand(escaped, len(snippets) + 1)
 
 def as_bool(v, default: bool = False) -> bool:
     """Parse common truthy/falsey values from front matter."""
@@ -901,6 +1567,16 @@ def as_bool(v, default: bool = False) -> bool:
     return default
 
 
+def as_float(v, default: float) -> float:
+    """Parse a number from front matter, falling back to `default`."""
+    if v is None or isinstance(v, bool):
+        return default
+    try:
+        return float(str(v).strip())
+    except ValueError:
+        return default
+
+
 def render_simple_md(md: str) -> str:
     """Paragraphs + unordered lists + callouts (::: ... :::)."""
     # Fix a common Markdown formatting issue in CVs:
@@ -908,7 +1584,7 @@ def render_simple_md(md: str) -> str:
     #     https://...
     #   )
     # When links are broken across lines, our line-based renderer would miss them.
-    md = re.sub(r"\]\(\s*\n\s*(https?://[^\s\)]+)\s*\)", r"](\1)", md or "", flags=re.I)
+    md = _BROKEN_LINK_RE.sub(r"](\1)", md or "")
 
     lines = (md or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
     out: List[str] = []
@@ -963,7 +1639,7 @@ def render_simple_md(md: str) -> str:
                     title = sub[1].strip() if len(sub) == 2 else ''
 
                 # Sanitize class name
-                ctype = re.sub(r'[^a-z0-9_-]+', '', ctype) or 'info'
+                ctype = _CSS_CLASS_STRIP_RE.sub('', ctype) or 'info'
                 if not title:
                     title = default_title(ctype)
 
@@ -1004,7 +1680,7 @@ def split_sections(md: str) -> Dict[str, str]:
     sections: Dict[str, List[str]] = {}
     cur = None
     for line in lines:
-        h = re.match(r"^##\s+(.*)$", line.strip())
+        h = _H2_RE.match(line.strip())
         if h:
             cur = h.group(1).strip()
             sections[cur] = []
@@ -1125,7 +1801,7 @@ def split_front_matter_raw(md_text: str) -> Tuple[str, str]:
     if not txt.startswith("---"):
         return bom, txt
 
-    m = re.match(r"^(---\s*\n.*?\n---\s*\n)(.*)$", txt, flags=re.S)
+    m = _FRONT_MATTER_RAW_RE.match(txt)
     if not m:
         return bom, txt
 
@@ -1140,91 +1816,617 @@ def is_ieee_xplore_url(u: str) -> bool:
 
 def ieee_doc_id(u: str) -> str:
     """Extract IEEE Xplore arnumber from common URL forms."""
-    m = re.search(r"/(?:abstract/)?document/(\d+)", u)
+    m = _IEEE_DOC_ID_RE.search(u)
     return m.group(1) if m else ""
 
 
-def fetch_text(url: str, timeout: int = 20) -> str:
-    """Fetch a URL as decoded text.
+# -----------------------------
+# --trace: Chrome trace-event spans (open the file in Perfetto or chrome://tracing)
+# -----------------------------
+# Complete ("X") events of this run; None while tracing is off
+_TRACE_EVENTS: Optional[List[dict]] = None
+_TRACE_T0 = 0.0
+_TRACE_THREADS: Dict[int, str] = {}
+_TRACE_LOCAL = threading.local()
+
+
+def enable_tracing() -> None:
+    global _TRACE_EVENTS, _TRACE_T0
+    _TRACE_EVENTS = []
+    _TRACE_T0 = time.perf_counter()
+
+
+def _trace_event(name: str, cat: str, t0: float, t1: float, args: Dict[str, object]) -> None:
+    events = _TRACE_EVENTS
+    if events is None:
+        return
+    tid = threading.get_ident()
+    _TRACE_THREADS.setdefault(tid, threading.current_thread().name)
+    events.append({"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": tid,
+                   "ts": round((t0 - _TRACE_T0) * 1e6, 1), "dur": round((t1 - t0) * 1e6, 1),
+                   "args": args})
+
+
+@contextmanager
+def trace_span(name: str, cat: str = "build", **args: object) -> Iterator[Dict[str, object]]:
+    """Time the block as one trace event. The yielded dict becomes the event's args, so the
+    block can add results (bytes, status, ...); an exception is recorded as args["error"]."""
+    if _TRACE_EVENTS is None:
+        yield args
+        return
+    t0 = time.perf_counter()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = "{}: {}".format(type(e).__name__, e)
+        raise
+    finally:
+        _trace_event(name, cat, t0, time.perf_counter(), args)
+
+
+def traced(cat: str = "build"):
+    """Decorator form of trace_span, named after the function; str results go to args["result"].
+    A trace_stage still open when the function returns (or raises) ends with it."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if _TRACE_EVENTS is None:
+                return fn(*a, **kw)
+            depth = getattr(_TRACE_LOCAL, "depth", 0)
+            _TRACE_LOCAL.depth = depth + 1
+            try:
+                with trace_span(fn.__name__, cat) as span:
+                    try:
+                        result = fn(*a, **kw)
+                    finally:
+                        cur = getattr(_TRACE_LOCAL, "stage", None)
+                        if cur is not None and cur[2] == depth + 1:
+                            trace_stage(None)
+                    if isinstance(result, str):
+                        span["result"] = result
+                    return result
+            finally:
+                _TRACE_LOCAL.depth = depth
+        return wrapper
+    return deco
+
+
+def trace_stage(name: Optional[str]) -> None:
+    """Back-to-back spans without re-indenting long functions: ends this thread's current
+    stage and starts `name` (None only ends it)."""
+    if _TRACE_EVENTS is None:
+        return
+    now = time.perf_counter()
+    cur = getattr(_TRACE_LOCAL, "stage", None)
+    if cur is not None:
+        _trace_event(cur[0], "stage", cur[1], now, {})
+    _TRACE_LOCAL.stage = (name, now, getattr(_TRACE_LOCAL, "depth", 0)) if name else None
+
+
+def save_trace(path: str) -> None:
+    """Write the recorded spans as a Chrome trace-event JSON file."""
+    events = list(_TRACE_EVENTS or [])
+    events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": nm}}
+               for tid, nm in _TRACE_THREADS.items()]
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    _write_bytes_atomic(path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"},
+                                         ensure_ascii=False).encode("utf-8"))
+    print('🧭 追踪：{} 个事件已写入 {}（可在 Perfetto / chrome://tracing 打开）'.format(len(events), path))
+
+
+_HOST_LOCK = threading.Lock()
+_HOST_SEMAPHORES: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_NEXT_START: Dict[str, float] = {}
+
+
+@contextmanager
+def _host_slot(url: str) -> Iterator[None]:
+    """Be polite per host: cap concurrent requests and space out request starts."""
+    host = (urlparse(url).netloc or "").lower()
+    with _HOST_LOCK:
+        sem = _HOST_SEMAPHORES.get(host)
+        if sem is None:
+            sem = _HOST_SEMAPHORES[host] = threading.BoundedSemaphore(max(1, int(fetch_per_host)))
+    with sem:
+        with _HOST_LOCK:
+            now = time.monotonic()
+            start = max(now, _HOST_NEXT_START.get(host, 0.0))
+            _HOST_NEXT_START[host] = start + max(0.0, float(fetch_interval))
+        if start > now:
+            time.sleep(start - now)
+        yield
+
+
+def fetch_text(url: str, timeout: int = 20, headers: Optional[Dict[str, str]] = None,
+               info: Optional[Dict[str, object]] = None, stop_after_line: Optional[bytes] = None,
+               max_bytes: Optional[int] = None) -> str:
+    """Fetch a URL as decoded text (throttled per host, see `_host_slot`).
+
+    With `stop_after_line` and/or `max_bytes` the body is streamed and reading stops
+    early (see `_gather_stream`, called from `_read_response`).
+    """
+    if info is None:
+        info = {}
+    with trace_span("fetch_text", "net", url=url) as span:
+        if fetch_mode == "offline":
+            text = _replay_fetch(url, info, stop_after_line, max_bytes)
+            span.update(source="replay", status=info.get("status"), bytes=info.get("bytes", 0))
+            return text
+        if fetch_mode == "record":
+            # Record complete answers, not 304s the archive could not replay
+            headers = {k: v for k, v in (headers or {}).items()
+                       if k.lower() not in ("if-none-match", "if-modified-since")}
+        text = _fetch_text_once(url, timeout=timeout, headers=headers, info=info,
+                                stop_after_line=stop_after_line, max_bytes=max_bytes)
+        span.update(source="network", status=info.get("status"), bytes=info.get("bytes", 0),
+                    truncated=bool(info.get("truncated")))
+        if fetch_mode == "record":
+            _record_fetch(url, text, info)
+        return text
+
+
+_ARCHIVE_LOCK = threading.Lock()
+_FETCH_ARCHIVE: Optional[Dict[str, dict]] = None  # loaded on first use
+_ARCHIVE_DIRTY = False
+
+
+def load_fetch_archive(path: Optional[str] = None) -> Dict[str, dict]:
+    """Recorded responses {url: {"status", "etag", "last_modified", "body"}} ({} if missing)."""
+    try:
+        with gzip.open(path or FETCH_ARCHIVE_PATH, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return {}
+    entries = data.get("entries") if isinstance(data, dict) else None
+    return entries if isinstance(entries, dict) else {}
+
+
+def _fetch_archive() -> Dict[str, dict]:
+    global _FETCH_ARCHIVE
+    with _ARCHIVE_LOCK:
+        if _FETCH_ARCHIVE is None:
+            _FETCH_ARCHIVE = load_fetch_archive()
+        return _FETCH_ARCHIVE
+
+
+def _record_fetch(url: str, text: str, info: Dict[str, object]) -> None:
+    global _ARCHIVE_DIRTY
+    archive = _fetch_archive()
+    entry = {"status": info.get("status", 200), "etag": info.get("etag", ""),
+             "last_modified": info.get("last_modified", ""), "body": text}
+    with _ARCHIVE_LOCK:
+        if archive.get(url) != entry:
+            archive[url] = entry
+            _ARCHIVE_DIRTY = True
+
+
+def _replay_fetch(url: str, info: Optional[Dict[str, object]], stop_after_line: Optional[bytes],
+                  max_bytes: Optional[int]) -> str:
+    """fetch_text from the archive; a URL that was never recorded fails like a network error."""
+    entry = _fetch_archive().get(url)
+    if entry is None:
+        raise URLError("offline: no recorded response for {}".format(url))
+    if info is not None:
+        info.update(status=entry.get("status", 200), etag=entry.get("etag", ""),
+                    last_modified=entry.get("last_modified", ""))
+    body = entry.get("body", "")
+    if stop_after_line or max_bytes:
+        data, truncated = _gather_stream([body.encode("utf-8")], stop_after_line, max_bytes)
+        if info is not None:
+            info["truncated"] = truncated
+        body = data.decode("utf-8", errors="replace")
+    if info is not None:
+        info["bytes"] = len(body.encode("utf-8"))
+    return body
+
+
+def save_fetch_archive(path: Optional[str] = None) -> None:
+    """Write the recorded responses (gzip, stable bytes for unchanged content) if anything was added."""
+    global _ARCHIVE_DIRTY
+    if not _ARCHIVE_DIRTY or _FETCH_ARCHIVE is None:
+        return
+    path = path or FETCH_ARCHIVE_PATH
+    content = json.dumps({"version": 1, "entries": _FETCH_ARCHIVE}, ensure_ascii=False, indent=1, sort_keys=True)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        _write_bytes_atomic(path, gzip.compress(content.encode("utf-8"), compresslevel=9, mtime=0))
+        _ARCHIVE_DIRTY = False
+        print("📼 已录制 {} 个响应：{}".format(len(_FETCH_ARCHIVE), path))
+    except OSError as e:
+        print("⚠️ 写入响应录制文件失败：{}".format(e))
+
+
+# IEEE Xplore pages put the citation <meta> tags and the one-line metadata blob
+# near the top; everything after that line is page chrome we never parse.
+IEEE_METADATA_MARKER = b"xplGlobal.document.metadata="
+FETCH_MAX_BYTES = 4 * 1024 * 1024
+_STREAM_CHUNK = 16 * 1024
+
+
+def _stream_decompressor(content_encoding: str):
+    """Incremental decoder for a Content-Encoding (None for identity)."""
+    enc = (content_encoding or "").lower()
+    if "gzip" in enc:
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+    if "deflate" not in enc:
+        return None
+    # "deflate" is zlib-wrapped per the RFC, but some servers send raw deflate:
+    # decide from the first two bytes.
+    state: Dict[str, object] = {}
+
+    def _decompress(chunk: bytes) -> bytes:
+        d = state.get("d")
+        if d is None:
+            zlib_wrapped = len(chunk) >= 2 and (chunk[0] & 0x0F) == 8 and (chunk[0] * 256 + chunk[1]) % 31 == 0
+            d = state["d"] = zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+        return d.decompress(chunk)
+    return _decompress
+
+
+def _gather_stream(chunks, stop_after_line: Optional[bytes], max_bytes: Optional[int],
+                   decompress=None) -> Tuple[bytes, bool]:
+    """Join (decompressed) body chunks until the line containing `stop_after_line` is
+    complete or `max_bytes` have been decoded. Returns (data, stopped_early)."""
+    buf = bytearray()
+    marker_at = -1
+    scan_from = 0
+    for chunk in chunks:
+        if decompress is not None:
+            chunk = decompress(chunk)
+        if not chunk:
+            continue
+        buf += chunk
+        if stop_after_line:
+            if marker_at < 0:
+                marker_at = buf.find(stop_after_line, scan_from)
+                if marker_at >= 0:
+                    scan_from = marker_at
+                else:
+                    scan_from = max(0, len(buf) - len(stop_after_line) + 1)
+            if marker_at >= 0:
+                nl = buf.find(b"\n", scan_from)
+                if nl >= 0:
+                    return bytes(buf[:nl + 1]), True
+                scan_from = len(buf)
+        if max_bytes and len(buf) >= max_bytes:
+            return bytes(buf[:max_bytes]), True
+    return bytes(buf), False
+
+
+# -----------------------------
+# Shared HTTP connections: one pooled requests.Session, or (without requests) a small
+# per-host pool of keep-alive http.client connections. Env proxies -> urllib.
+# -----------------------------
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# requests = attempts sent, connections = TCP/TLS connections opened, retries = backoff retries
+POOL_STATS = {"requests": 0, "connections": 0, "retries": 0}
+_POOL_LOCK = threading.Lock()
+_HTTP_SESSION = None  # requests.Session once created, False if requests is not installed
+# Idle keep-alive connections by (scheme, netloc): checked out by one request at a time and
+# returned once its body was read completely (guarded by _POOL_LOCK)
+_HTTP_IDLE: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+# Body bytes still read after stopping early (stop_after_line) to keep the connection reusable
+_DRAIN_MAX_BYTES = 64 * 1024
+
+
+def _pool_count(key: str, n: int = 1) -> None:
+    with _POOL_LOCK:
+        POOL_STATS[key] += n
+
+
+def _requests_session():
+    """The shared requests.Session (None if requests is not installed)."""
+    global _HTTP_SESSION
+    with _POOL_LOCK:
+        if _HTTP_SESSION is None:
+            try:
+                import requests  # type: ignore
+            except ImportError:
+                _HTTP_SESSION = False
+            else:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=max(4, int(fetch_workers)))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _HTTP_SESSION = session
+    return _HTTP_SESSION or None
+
+
+def pool_stats(session_only: bool = False) -> Dict[str, int]:
+    """POOL_STATS plus connections opened by the requests pool, and how many requests reused one
+    (`session_only`: just the requests pool's connections)."""
+    stats = dict(POOL_STATS)
+    if session_only:
+        stats["connections"] = 0
+    session = _HTTP_SESSION
+    if session:
+        for adapter in session.adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            for key in (list(pools.keys()) if pools is not None else []):
+                stats["connections"] += getattr(pools.get(key), "num_connections", 0)
+    stats["reused"] = max(0, stats["requests"] - stats["connections"])
+    return stats
+
+
+def _pooled_connection(scheme: str, netloc: str, timeout: int, fresh: bool = False):
+    """Check out (connection, reused) for a host: an idle one from the pool unless `fresh`,
+    else a new one. Hand it back with `_release_connection` or close it."""
+    if not fresh:
+        with _POOL_LOCK:
+            idle = _HTTP_IDLE.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    _pool_count("connections")
+    return cls(netloc, timeout=timeout), False
+
+
+def _release_connection(scheme: str, netloc: str, conn) -> None:
+    """Return a connection whose last response was read completely to the idle pool."""
+    with _POOL_LOCK:
+        idle = _HTTP_IDLE.setdefault((scheme, netloc), [])
+        # More idle connections than requests a host may have in flight are never needed
+        if len(idle) < max(1, int(fetch_per_host)):
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def close_idle_connections() -> None:
+    """Close the pooled keep-alive connections (end of a build; the next fetch reconnects)."""
+    global _HTTP_SESSION
+    with _POOL_LOCK:
+        conns = [c for idle in _HTTP_IDLE.values() for c in idle]
+        _HTTP_IDLE.clear()
+        session = _HTTP_SESSION
+        if session:
+            # Keep its connection count in POOL_STATS: pool_stats() only sees the live session
+            POOL_STATS["connections"] += pool_stats(session_only=True)["connections"]
+            _HTTP_SESSION = None
+    for conn in conns:
+        conn.close()
+    if session:
+        session.close()
+
+
+def _uses_proxy(url: str) -> bool:
+    pu = urlparse(url)
+    return bool(getproxies().get(pu.scheme)) and not proxy_bypass(pu.hostname or "")
+
+
+def _open_http_client(url: str, headers: Dict[str, str], timeout: int):
+    """GET over a pooled keep-alive connection, following redirects."""
+    for _hop in range(6):
+        pu = urlparse(url)
+        if pu.scheme not in ("http", "https"):
+            raise URLError("unsupported URL scheme: {}".format(url))
+        target = (pu.path or "/") + ("?" + pu.query if pu.query else "")
+        conn, reused = _pooled_connection(pu.scheme, pu.netloc, timeout)
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed the idle keep-alive connection: once more on a fresh one
+            conn, _ = _pooled_connection(pu.scheme, pu.netloc, timeout, fresh=True)
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+        location = resp.getheader("Location")
+        if resp.status in _REDIRECT_STATUSES and location:
+            resp.read()
+            if resp.will_close:
+                conn.close()
+            else:
+                _release_connection(pu.scheme, pu.netloc, conn)
+            url = urljoin(url, location)
+            continue
 
-    Why this exists:
-    - Some sites (incl. IEEE Xplore) may serve compressed content.
-    - urllib does not always auto-decompress; requests usually does.
+        def finish(complete: bool, resp=resp, pu=pu, conn=conn) -> None:
+            # A connection can only go back to the pool once its body was read completely.
+            # After an early stop a short known remainder is cheaper to read than a new TLS handshake.
+            if not complete and not resp.will_close and resp.length is not None and resp.length <= _DRAIN_MAX_BYTES:
+                try:
+                    resp.read()
+                    complete = True
+                except (http.client.HTTPException, OSError):
+                    pass
+            if complete and not resp.will_close:
+                _release_connection(pu.scheme, pu.netloc, conn)
+            else:
+                conn.close()
+        return resp.status, resp.headers, iter(lambda: resp.read(_STREAM_CHUNK), b""), False, finish
+    raise URLError("too many redirects: {}".format(url))
 
-    Strategy:
-    1) Prefer `requests` if installed (handles gzip/deflate transparently).
-    2) Fall back to urllib + manual gzip/deflate decompress.
 
-    Note: we *do not* advertise brotli (br) in Accept-Encoding to avoid needing extra deps.
+def _open_stream(url: str, headers: Dict[str, str], timeout: int):
+    """Start a GET; returns (status, headers, body chunks, already_decoded, finish(complete))."""
+    session = _requests_session()
+    if session is not None:
+        try:
+            r = session.get(url, headers=headers, timeout=timeout, stream=True)
+            # iter_content already undoes Content-Encoding
+            return r.status_code, r.headers, r.iter_content(_STREAM_CHUNK), True, lambda complete: r.close()
+        except Exception:
+            # If requests is present but fails (proxy/cert/etc.), fall back to the stdlib.
+            pass
+    if not _uses_proxy(url):
+        return _open_http_client(url, headers, timeout)
+    _pool_count("connections")
+    try:
+        resp = urlopen(Request(url, headers=headers), timeout=timeout)
+        status = resp.status
+    except HTTPError as e:
+        resp, status = e, e.code
+    return status, resp.headers, iter(lambda: resp.read(_STREAM_CHUNK), b""), False, lambda complete: resp.close()
+
+
+def _retry_delay(resp_headers, attempt: int) -> float:
+    """Seconds to wait before retry `attempt` (Retry-After if given, else exponential backoff)."""
+    ra = ((resp_headers.get("Retry-After") if resp_headers is not None else "") or "").strip()
+    if ra.isdigit():
+        return min(float(ra), 60.0)
+    if ra:
+        try:
+            when = parsedate_to_datetime(ra)
+            return min(max(0.0, when.timestamp() - time.time()), 60.0)
+        except (TypeError, ValueError):
+            pass
+    return max(0.0, float(fetch_backoff)) * (2 ** attempt)
+
+
+def _fetch_text_once(url: str, timeout: int = 20, headers: Optional[Dict[str, str]] = None,
+                     info: Optional[Dict[str, object]] = None, stop_after_line: Optional[bytes] = None,
+                     max_bytes: Optional[int] = None) -> str:
+    """Fetch a URL as decoded text over a pooled keep-alive connection (see `_open_stream`).
+
+    - gzip/deflate bodies are decompressed (incrementally, without requests).
+      We *do not* advertise brotli (br) in Accept-Encoding to avoid needing extra deps.
+    - 429 and 5xx answers, connection errors and timeouts are retried `fetch_retries` times,
+      waiting Retry-After or `fetch_backoff` * 2^attempt seconds outside the host slot.
+      Other errors (bad URL, DNS, TLS) fail at once.
+    - Conditional GET: pass `If-None-Match` / `If-Modified-Since` via `headers`.
+      If `info` is given it receives `status`, `etag`, `last_modified`, `truncated` and
+      `bytes` (decoded body size);
+      a `304 Not Modified` answer returns "" with info["status"] == 304.
+    - `stop_after_line` / `max_bytes`: stop reading early (see `_gather_stream`).
     """
-    headers = {
+    req_headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/109.0",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "zh-CN,zh;q=0.8,en-US;q=0.3,en;q=0.2",
         "Accept-Encoding": "gzip, deflate",
-        "Connection": "close",
         "Upgrade-Insecure-Requests": "1",
     }
+    if headers:
+        req_headers.update(headers)
+    if info is None:
+        info = {}
+
+    retries = max(0, int(fetch_retries))
+    attempt = 0
+    while True:
+        # The host slot is held for one attempt (request + body) and released while backing
+        # off, so a throttled URL does not stall the other workers for that host.
+        with _host_slot(url):
+            _pool_count("requests")
+            try:
+                status, resp_headers, chunks, decoded, finish = _open_stream(url, req_headers, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt >= retries or not _transient_error(e):
+                    raise
+                delay = _retry_delay(None, attempt)
+            else:
+                if status in _RETRY_STATUSES and attempt < retries:
+                    finish(False)
+                    delay = _retry_delay(resp_headers, attempt)
+                else:
+                    return _read_response(url, status, resp_headers, chunks, decoded, finish,
+                                          info, stop_after_line, max_bytes)
+        _pool_count("retries")
+        time.sleep(delay)
+        attempt += 1
+
+
+def _transient_error(e: BaseException) -> bool:
+    """Connection problems and timeouts are retried; bad URLs, DNS or TLS errors are not."""
+    if isinstance(e, URLError) and not isinstance(e, HTTPError):
+        e = e.reason if isinstance(e.reason, BaseException) else None
+    return isinstance(e, (ConnectionError, TimeoutError, socket.timeout, http.client.IncompleteRead))
 
-    # 1) Try requests first
+
+def _apparent_encoding(data: bytes) -> str:
+    """Charset for a body whose Content-Type has none: UTF-8 if it decodes, else what
+    charset_normalizer / chardet guess (as requests' apparent_encoding did), else UTF-8."""
     try:
-        import requests  # type: ignore
-        r = requests.get(url, headers=headers, timeout=timeout)
-        r.raise_for_status()
-        # Let requests decide encoding; fallback to apparent
-        if not r.encoding:
-            r.encoding = r.apparent_encoding
-        return r.text
-    except ImportError:
+        codecs.getincrementaldecoder("utf-8")().decode(data, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
         pass
-    except Exception:
-        # If requests is present but fails (proxy/cert/etc.), fall back to urllib.
-        pass
-
-    # 2) urllib fallback
-    req = Request(url, headers=headers)
-    with urlopen(req, timeout=timeout) as resp:
-        data = resp.read()
-        enc_hdr = (resp.headers.get("Content-Encoding") or "").lower()
-        if "gzip" in enc_hdr:
-            try:
-                import gzip
-                data = gzip.decompress(data)
-            except Exception:
-                pass
-        elif "deflate" in enc_hdr:
-            try:
-                import zlib
-                # Try raw deflate first, then zlib-wrapped
-                try:
-                    data = zlib.decompress(data, -zlib.MAX_WBITS)
-                except Exception:
-                    data = zlib.decompress(data)
-            except Exception:
-                pass
+    for name in ("charset_normalizer", "chardet"):
+        try:
+            detector = __import__(name)
+        except ImportError:
+            continue
+        enc = (detector.detect(data) or {}).get("encoding")
+        if enc:
+            return enc
+    return "utf-8"
 
-        # Guess charset
-        ctype = (resp.headers.get("Content-Type") or "").lower()
-        m = re.search(r"charset=([\w\-]+)", ctype)
-        enc = m.group(1) if m else "utf-8"
 
+def _read_response(url: str, status: int, resp_headers, chunks, decoded: bool, finish,
+                   info: Dict[str, object], stop_after_line: Optional[bytes], max_bytes: Optional[int]) -> str:
+    """Body of an opened response as text (see `_fetch_text_once`)."""
+    complete = False
     try:
-        return data.decode(enc, errors="replace")
-    except Exception:
+        info["status"] = status
+        info["etag"] = (resp_headers.get("ETag") or "").strip()
+        info["last_modified"] = (resp_headers.get("Last-Modified") or "").strip()
+        if status == 304:
+            for _chunk in chunks:  # no body, but reading it lets the connection go back to the pool
+                pass
+            complete = True
+            return ""
+        if status >= 400:
+            raise HTTPError(url, status, "HTTP Error {}".format(status), resp_headers, None)
+        decompress = None if decoded else _stream_decompressor(resp_headers.get("Content-Encoding", ""))
+        data, truncated = _gather_stream(chunks, stop_after_line, max_bytes, decompress)
+        complete = not truncated
+        info["truncated"] = truncated
+        info["bytes"] = len(data)
+    finally:
+        finish(complete)
+
+    # Declared charset, else a guess
+    m = _CHARSET_RE.search((resp_headers.get("Content-Type") or "").lower())
+    try:
+        return data.decode(m.group(1) if m else _apparent_encoding(data), errors="replace")
+    except LookupError:
         return data.decode("utf-8", errors="replace")
 
 
-def extract_meta(html_text: str, name: str) -> List[str]:
-    """Extract <meta name="..." content="..."> values (case-insensitive)."""
+def meta_index(html_text: str) -> Dict[str, List[str]]:
+    """All <meta name="..." content="..."> tags in one pass: {lowercased name: [values]}.
+
+    Values are HTML-unescaped and stripped; empty ones are dropped. Build it once
+    per page and look names up, instead of scanning the page once per name.
+    """
+    index: Dict[str, List[str]] = {}
     if not html_text:
-        return []
-    # Support both single and double quotes
-    pat = re.compile(
-        r"<meta[^>]+name\s*=\s*(['\"]){}\1[^>]*content\s*=\s*(['\"])(.*?)\2".format(re.escape(name)),
-        flags=re.I | re.S,
-    )
-    vals = [html.unescape(m.group(3)).strip() for m in pat.finditer(html_text)]
-    return [v for v in vals if v]
+        return index
+    for tag in _META_TAG_RE.finditer(html_text):
+        name = content = None
+        for am in _TAG_ATTR_RE.finditer(tag.group(1)):
+            key = am.group(1).lower()
+            if key == "name" and name is None:
+                name = am.group(2) if am.group(2) is not None else am.group(3) if am.group(3) is not None else am.group(4)
+            elif key == "content" and content is None:
+                content = am.group(2) if am.group(2) is not None else am.group(3) if am.group(3) is not None else am.group(4)
+        if name and content:
+            value = html.unescape(content).strip()
+            if value:
+                index.setdefault(name.strip().lower(), []).append(value)
+    return index
+
+
+def extract_meta(html_text: str, name: str) -> List[str]:
+    """Extract <meta name="..." content="..."> values (case-insensitive).
+
+    For several names on the same page, build `meta_index` once instead.
+    """
+    return meta_index(html_text).get(name.lower(), [])
 
 
 def author_to_initials(full: str) -> str:
@@ -1238,10 +2440,10 @@ def author_to_initials(full: str) -> str:
     if not full:
         return ""
     # If the name already looks abbreviated, keep it.
-    if re.search(r"\b[A-Z]\.", full):
+    if _INITIAL_RE.search(full):
         return full
 
-    parts = [p for p in re.split(r"\s+", full) if p]
+    parts = [p for p in _WS_RE.split(full) if p]
     if len(parts) == 1:
         return parts[0]
     last = parts[-1]
@@ -1274,7 +2476,7 @@ def format_authors(authors: List[str]) -> str:
 
 def safe_bib_key(s: str) -> str:
     s = (s or "")
-    s = re.sub(r"[^A-Za-z0-9]+", "", s)
+    s = _NON_ALNUM_RE.sub("", s)
     return s or "ref"
 
 
@@ -1310,38 +2512,39 @@ def make_bibtex(meta: Dict[str, str], key: str) -> str:
 
 
 def _find_matching_brace(s: str, start: int) -> int:
-    """Return index of the matching closing brace for s[start]=='{', else -1."""
+    """Return index of the matching closing brace for s[start]=='{', else -1.
+
+    Quotes (single or double) open strings in which braces do not count and a
+    backslash escapes the next character. Only structural characters are visited:
+    the regex skips the text between them in C.
+    """
     if start < 0 or start >= len(s) or s[start] != '{':
         return -1
+    search = _BRACE_SCAN_RE.search
     depth = 0
-    in_str = False
-    esc_next = False
     quote = ''
-    for i in range(start, len(s)):
-        ch = s[i]
-        if in_str:
-            if esc_next:
-                esc_next = False
-                continue
+    pos = start
+    while True:
+        m = search(s, pos)
+        if m is None:
+            return -1
+        ch = m.group()
+        i = m.start()
+        pos = i + 1
+        if quote:
             if ch == '\\':
-                esc_next = True
-                continue
-            if ch == quote:
-                in_str = False
+                pos = i + 2
+            elif ch == quote:
                 quote = ''
             continue
-        else:
-            if ch in ('"', "'"):
-                in_str = True
-                quote = ch
-                continue
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-                if depth == 0:
-                    return i
-    return -1
+        if ch == '"' or ch == "'":
+            quote = ch
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i
 
 
 
@@ -1372,22 +2575,28 @@ def _extract_ieee_metadata_fallback(page: str) -> Optional[dict]:
         end = min(len(page), start + 200000)
     line = page[start:end]
 
-    def _grab(pattern: str) -> str:
-        m = re.search(pattern, line)
-        return _unescape_js_str(m.group(1)) if m else ''
-
-    title = _grab(r'"formulaStrippedArticleTitle"\s*:\s*"([^"]+)"') or _grab(r'"articleTitle"\s*:\s*"([^"]+)"') or _grab(r'"title"\s*:\s*"([^"]+)"')
-    venue = _grab(r'"publicationTitle"\s*:\s*"([^"]+)"') or _grab(r'"conferenceTitle"\s*:\s*"([^"]+)"')
-    pubdate = _grab(r'"publicationDate"\s*:\s*"([^"]+)"') or _grab(r'"publicationYear"\s*:\s*"?((?:19|20)\d{2})"?')
-    doi = _grab(r'"doi"\s*:\s*"([^"]+)"')
-    ptype = _grab(r'"publicationType"\s*:\s*"([^"]+)"') or _grab(r'"contentType"\s*:\s*"([^"]+)"')
-    citation = _grab(r'"citationCountPaper"\s*:\s*([0-9]+)')
+    def _grab(patterns) -> str:
+        # First pattern that matches wins
+        for pat in patterns:
+            m = pat.search(line)
+            if m:
+                v = _unescape_js_str(m.group(1))
+                if v:
+                    return v
+        return ''
+
+    title = _grab(_XPL_TITLE_RES)
+    venue = _grab(_XPL_VENUE_RES)
+    pubdate = _grab(_XPL_PUBDATE_RES)
+    doi = _grab(_XPL_DOI_RES)
+    ptype = _grab(_XPL_PTYPE_RES)
+    citation = _grab(_XPL_CITATION_RES)
 
     authors_blob = ''
-    m = re.search(r'"authors"\s*:\s*\[(.*)\]\s*,\s*"', line)
+    m = _XPL_AUTHORS_RE.search(line)
     if m:
         authors_blob = m.group(1)
-    names = re.findall(r'"name"\s*:\s*"([^"]+)"', authors_blob)
+    names = _XPL_NAME_RE.findall(authors_blob)
     authors = [{"name": _unescape_js_str(n)} for n in names if n.strip()]
 
     data = {}
@@ -1408,7 +2617,7 @@ def _extract_ieee_metadata_fallback(page: str) -> Optional[dict]:
 
     # Early Access flag (best-effort)
     try:
-        m_ea = re.search(r'"isEarlyAccess"\s*:\s*(true|false|"true"|"false"|1|0)', line, flags=re.I)
+        m_ea = _XPL_EARLY_ACCESS_RE.search(line)
         if m_ea:
             v = m_ea.group(1).strip().strip('"').lower()
             data["isEarlyAccess"] = True if v in ("true", "1", "yes") else False
@@ -1417,6 +2626,9 @@ def _extract_ieee_metadata_fallback(page: str) -> Optional[dict]:
 
     return data or None
 
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _extract_ieee_metadata_json(page: str) -> Optional[dict]:
     """Extract the JSON object from `xplGlobal.document.metadata=...` if present."""
     if not page:
@@ -1428,6 +2640,13 @@ def _extract_ieee_metadata_json(page: str) -> Optional[dict]:
     idx = page.find('{', idx)
     if idx == -1:
         return None
+    # Usually the blob is plain JSON: decode it in place, without slicing the page.
+    try:
+        data, _end = _JSON_DECODER.raw_decode(page, idx)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
     end = _find_matching_brace(page, idx)
     if end == -1:
         return None
@@ -1446,6 +2665,14 @@ def _extract_ieee_metadata_json(page: str) -> Optional[dict]:
             return None
 
 
+def ieee_document_url(u: str) -> str:
+    """Normalize an IEEE Xplore URL (or a bare document id) to https://ieeexplore.ieee.org/document/<id>
+    ("" if no id). This is the key of META_DISK_CACHE / PUB_META_CACHE."""
+    u = (u or "").strip()
+    docid = u if u.isdigit() else ieee_doc_id(u)
+    return f"https://ieeexplore.ieee.org/document/{docid}" if docid else ""
+
+
 def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
     """Fetch metadata from an IEEE Xplore document URL.
 
@@ -1459,52 +2686,61 @@ def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
         return None
 
     # Normalize URL to /document/<id>
-    docid = ieee_doc_id(url)
-    if docid:
-        url = f"https://ieeexplore.ieee.org/document/{docid}"
+    url = ieee_document_url(url) or url
 
     try:
-        page = fetch_text(url)
+        page = fetch_text(ieee_request_url(url), stop_after_line=IEEE_METADATA_MARKER, max_bytes=FETCH_MAX_BYTES)
+    except Exception:
+        page = ''
 
-        # Extra: citation meta tags often include an "online date" even for Early Access.
-        def _grab_meta(name: str) -> str:
-            m = re.search(
-                r'<meta\s+name=["\']' + re.escape(name) + r'["\']\s+content=["\']([^"\']+)["\']',
-                page,
-                flags=re.I,
-            )
-            return m.group(1).strip() if m else ""
+    return parse_ieee_xplore_page(page, url)
 
-        citation_online_date = _grab_meta("citation_online_date")
-        citation_pub_date = _grab_meta("citation_publication_date")
-        citation_date = _grab_meta("citation_date")
 
-    except Exception:
-        page = ''
+def ieee_page_head(page: str) -> str:
+    """An Xplore page up to the end of its metadata line, i.e. what a streamed fetch reads
+    (the whole page if it has no such line)."""
+    at = page.find(IEEE_METADATA_MARKER.decode("ascii"))
+    nl = page.find("\n", at) if at >= 0 else -1
+    return page[:nl + 1] if nl >= 0 else page
+
+
+def parse_ieee_xplore_page(page: str, url: str) -> Optional[Dict[str, str]]:
+    """Extract publication metadata from a fetched IEEE Xplore document page."""
+
+    # All <meta> tags, indexed once (the lookups below used to rescan the page each)
+    metas = meta_index(page)
+
+    # Extra: citation meta tags often include an "online date" even for Early Access.
+    def _grab_meta(name: str) -> str:
+        return (metas.get(name) or [""])[0]
+
+    citation_online_date = _grab_meta("citation_online_date")
+    citation_pub_date = _grab_meta("citation_publication_date")
+    citation_date = _grab_meta("citation_date")
 
     data = _extract_ieee_metadata_json(page)
 
     # Fallback: meta tags (some mirrors/old pages)
     if not data:
         try:
-            title = (extract_meta(page, 'citation_title') or [''])[0]
-            authors = extract_meta(page, 'citation_author')
+            title = (metas.get('citation_title') or [''])[0]
+            authors = metas.get('citation_author', [])
             venue = ''
             for nm in ('citation_journal_title', 'citation_conference_title', 'citation_book_title'):
-                vv = extract_meta(page, nm)
+                vv = metas.get(nm)
                 if vv:
                     venue = vv[0]
                     break
             year = ''
             for nm in ('citation_publication_date', 'citation_date', 'citation_year'):
-                vv = extract_meta(page, nm)
+                vv = metas.get(nm)
                 if vv:
-                    m = re.search(r"(19|20)\d{2}", vv[0])
+                    m = _YEAR_RE.search(vv[0])
                     if m:
                         year = m.group(0)
                         break
-            doi = (extract_meta(page, 'citation_doi') or [''])[0]
-            bib_type = 'article' if extract_meta(page, 'citation_journal_title') else 'inproceedings' if extract_meta(page, 'citation_conference_title') else 'misc'
+            doi = (metas.get('citation_doi') or [''])[0]
+            bib_type = 'article' if metas.get('citation_journal_title') else 'inproceedings' if metas.get('citation_conference_title') else 'misc'
             return {
                 'title': title,
                 'authors_list': authors,
@@ -1566,7 +2802,9 @@ def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
         is_early_access = True
     if (not is_early_access) and pubdate and ('early access' in pubdate.lower()):
         is_early_access = True
-    if (not is_early_access) and ('early access' in page.lower()):
+    # Free-text "Early Access" (e.g. in the blob's journal title), only looked for up to the end of
+    # the metadata line: fetches stop reading there, and a full page must give the same answer.
+    if (not is_early_access) and ('early access' in ieee_page_head(page).lower()):
         is_early_access = True
 
 # Year
@@ -1574,7 +2812,7 @@ def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
     for k in ('publicationDate', 'publicationYear', 'publication_date', 'publication_year'):
         v = data.get(k)
         if isinstance(v, str):
-            m = re.search(r"(19|20)\d{2}", v)
+            m = _YEAR_RE.search(v)
             if m:
                 year = m.group(0)
                 break
@@ -1588,7 +2826,7 @@ def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
         v = data.get(k)
         if isinstance(v, str) and v.strip():
             # doiLink may be like 'https://doi.org/10....'
-            m = re.search(r'10\.\d{4,9}/[^\s"<>]+', v)
+            m = _DOI_RE.search(v)
             doi = m.group(0) if m else v.strip()
             break
 
@@ -1614,6 +2852,426 @@ def fetch_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
 }
 
 
+def load_meta_cache(path: str = META_CACHE_PATH) -> Dict[str, dict]:
+    """Load the persistent IEEE metadata cache ({} if missing or unreadable)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    entries = data.get("entries") if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        return {}
+    return {k: v for k, v in entries.items() if isinstance(v, dict) and isinstance(v.get("meta"), dict)}
+
+
+def save_meta_cache(entries: Dict[str, dict], path: str = META_CACHE_PATH) -> None:
+    """Write the persistent IEEE metadata cache atomically (only if its content changed)."""
+    content = json.dumps({"version": 1, "entries": entries}, ensure_ascii=False, indent=1, sort_keys=True) + "\n"
+    try:
+        write_text_if_changed(path, content)
+    except OSError as e:
+        print("⚠️ 写入元数据缓存失败：{}".format(e))
+
+
+# In-memory builds (preview server): files the build would create go here instead of onto
+# disk, keyed by "/"-separated relative path. None during normal builds.
+preview_outputs: Optional[Dict[str, str]] = None
+
+
+# Watch mode: watched inputs the running build wrote itself (bib files, _content stubs, CV.md
+# writeback), as {normalized path: content hash}, so watch_site does not mistake them for edits.
+# None outside watch_build.
+build_writes: Optional[Dict[str, str]] = None
+
+
+def note_build_write(path: str, content: str) -> None:
+    """Record that the build wrote `content` to `path` (see build_writes)."""
+    if build_writes is not None:
+        build_writes[os.path.normpath(path)] = content_hash(content)
+
+
+def write_output(path: str, content: str) -> bool:
+    """write_text_if_changed, or keep the file in preview_outputs during an in-memory build."""
+    if preview_outputs is not None:
+        preview_outputs[os.path.normpath(path).replace(os.sep, "/")] = content
+        return True
+    note_build_write(path, content)
+    return write_text_if_changed(path, content)
+
+
+def read_output(path: str) -> str:
+    """A file as the current build sees it: preview_outputs first, then the disk."""
+    if preview_outputs is not None:
+        text = preview_outputs.get(os.path.normpath(path).replace(os.sep, "/"))
+        if text is not None:
+            return text
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _write_bytes_atomic(path: str, data: bytes) -> None:
+    """Write `data` to a temp file next to `path`, then rename it over `path`."""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    # Per process and thread: page threads may write the same output (a repeated nav href) at once
+    tmp = os.path.join(d, ".{}.tmp-{}-{}".format(os.path.basename(path), os.getpid(), threading.get_ident()))
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_text_if_changed(path: str, content: str, normalize=None) -> bool:
+    """Atomically (temp file + rename) write `content` unless the file already holds it.
+
+    `normalize`, if given, maps both old and new text before comparing, so volatile
+    parts (e.g. the "Last updated" stamp) do not force a rewrite.
+    Returns True if the file was written.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            old = f.read()
+    except OSError:
+        old = None
+    if old is not None:
+        if old == content or (normalize is not None and normalize(old) == normalize(content)):
+            return False
+    _write_bytes_atomic(path, content.encode("utf-8"))
+    return True
+
+
+_PAGE_STAMP_RE = re.compile(r'(<div>Last updated: )\d{4}-\d{2}-\d{2}(</div>)|(<div class="footer">© )\d{4}')
+
+
+def strip_page_stamps(page_html: str) -> str:
+    """Blank out the build date/year so pages can be compared by content."""
+    return _PAGE_STAMP_RE.sub(lambda m: (m.group(1) or m.group(3) or "") + (m.group(2) or ""), page_html)
+
+
+def content_hash(s: str) -> str:
+    """Short stable hash of a text input (for build manifests)."""
+    return hashlib.sha1((s or "").encode("utf-8")).hexdigest()[:16]
+
+
+def load_build_manifest(path: str = BUILD_MANIFEST_PATH) -> Dict[str, dict]:
+    """Return {output_page: {"inputs": {input_name: hash}}} from the last build."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    pages = data.get("pages") if isinstance(data, dict) else None
+    return pages if isinstance(pages, dict) else {}
+
+
+def save_build_manifest(pages: Dict[str, dict], path: str = BUILD_MANIFEST_PATH) -> None:
+    content = json.dumps({"version": 1, "pages": pages}, ensure_ascii=False, indent=1, sort_keys=True) + "\n"
+    try:
+        write_text_if_changed(path, content)
+    except OSError as e:
+        print("⚠️ 写入构建清单失败：{}".format(e))
+
+
+# -----------------------------
+# Precompressed sidecars (front matter 'precompress: true'): foo.html -> foo.html.gz / foo.html.br
+# -----------------------------
+def _brotli_module():
+    """brotli or brotlicffi if installed (both expose compress/MODE_TEXT), else None."""
+    for name in ("brotli", "brotlicffi"):
+        try:
+            return __import__(name)
+        except ImportError:
+            continue
+    return None
+
+
+def compress_sidecars(path: str) -> List[str]:
+    """Write path.gz (level 9, mtime 0 so unchanged input gives identical bytes) and,
+    if a brotli module is available, path.br. A sidecar that already decompresses to the
+    current content is kept (no mtime test: a same-tick rewrite must not leave it stale).
+
+    Runs in worker processes, so it only takes/returns plain values. Returns the written paths.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    brotli = _brotli_module()
+    targets = [(".gz", lambda b: gzip.compress(b, compresslevel=9, mtime=0), gzip.decompress)]
+    if brotli is not None:
+        targets.append((".br", lambda b: brotli.compress(b, quality=11), brotli.decompress))
+
+    written: List[str] = []
+    for ext, compress, decompress in targets:
+        side = path + ext
+        try:
+            with open(side, "rb") as f:
+                if decompress(f.read()) == data:
+                    continue
+        except Exception:
+            pass  # missing or unreadable: (re)write it
+        _write_bytes_atomic(side, compress(data))
+        written.append(side)
+    return written
+
+
+def precompress_outputs(paths: List[str], workers: Optional[int] = None) -> List[str]:
+    """compress_sidecars over `paths` on a process pool (serially if that is not possible)."""
+    paths = sorted({p for p in paths if p and os.path.isfile(p)})
+    if not paths:
+        return []
+    results: Optional[List[List[str]]] = None
+    if len(paths) > 1 and (workers is None or workers > 1):
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(compress_sidecars, paths, chunksize=4))
+        except (OSError, NotImplementedError, RuntimeError) as e:
+            # e.g. no /dev/shm or fork restrictions: compressing in-process is still fine
+            print("⚠️ 进程池不可用，改为串行压缩：{}".format(e))
+    if results is None:
+        results = [compress_sidecars(p) for p in paths]
+    return [w for ws in results for w in ws]
+
+
+# -----------------------------
+# Build report ('--report PATH') and performance budgets (front matter 'budgets', '--budgets FILE')
+# -----------------------------
+# One rule per string, e.g.  "papers.html gzip <= 40 KB", "*.html dom_nodes <= 3000",
+# "total raw <= 500 KB", "fetches <= 0", "build_ms <= 2 s"  ('≤' and "40 KB gz" work too).
+# Units (any case): B / KB / MB for sizes, ms / s for build_ms, none for counts.
+_BUDGET_RULE_RE = re.compile(
+    r"^\s*(?P<target>\S+)\s+(?:(?P<metric>[A-Za-z_]+)\s*)?(?:<=|≤)\s*(?P<num>\d+(?:\.\d+)?)"
+    r"\s*(?P<unit>[KkMm]?[Bb]|[Mm][Ss]|[Ss])?\s*(?P<metric2>[A-Za-z_]+)?\s*$")
+_BUDGET_METRICS = {
+    "raw": "raw", "size": "raw", "gzip": "gzip", "gz": "gzip", "minified": "minified", "min": "minified",
+    "dom_nodes": "dom_nodes", "nodes": "dom_nodes", "inline_scripts": "inline_scripts",
+    "scripts": "inline_scripts", "inline_styles": "inline_styles", "styles": "inline_styles",
+}
+_BUILD_METRICS = {"fetches": "network_fetches", "network_fetches": "network_fetches",
+                  "build_ms": "build_ms", "build_time": "build_ms", "time": "build_ms"}
+_SIZE_METRICS = ("raw", "gzip", "minified")
+_BUDGET_UNITS = {"b": 1, "kb": 1024, "mb": 1024 * 1024, "ms": 1, "s": 1000}
+_SIZE_UNITS = ("b", "kb", "mb")
+_TIME_UNITS = ("ms", "s")
+
+
+def page_stats(page: str, raw_size: Optional[int] = None) -> Dict[str, int]:
+    """Raw / gzip / minified bytes, element count and inline <script>/<style> blocks of one page.
+    `page` is the HTML as served; `raw_size` is its size before minification, if it was minified."""
+    raw = page.encode("utf-8")
+    counts = {"dom_nodes": 0, "inline_scripts": 0, "inline_styles": 0}
+
+    def start(tag, attrs):
+        counts["dom_nodes"] += 1
+        if tag == "style":
+            counts["inline_styles"] += 1
+        elif tag == "script" and not any(k == "src" for k, _v in attrs):
+            counts["inline_scripts"] += 1
+
+    parser = HTMLParser(convert_charrefs=True)
+    parser.handle_starttag = start
+    parser.handle_startendtag = start
+    parser.feed(page)
+    parser.close()
+    stats = {
+        "raw": len(raw) if raw_size is None else raw_size,
+        "gzip": len(gzip.compress(raw, compresslevel=9, mtime=0)),
+        "minified": len(minify_html(page).encode("utf-8")),
+    }
+    stats.update(counts)
+    return stats
+
+
+def build_report(pages: Dict[str, str], build_ms: float, network_fetches: int,
+                 raw_sizes: Optional[Dict[str, int]] = None) -> dict:
+    """The machine-readable report for one build; `pages` maps output file -> HTML as served,
+    `raw_sizes` output file -> unminified bytes."""
+    raw_sizes = raw_sizes or {}
+    per_page = {name: page_stats(text, raw_sizes.get(name)) for name, text in sorted(pages.items())}
+    totals = {k: sum(st[k] for st in per_page.values()) for k in _SIZE_METRICS}
+    totals["pages"] = len(per_page)
+    return {
+        "version": 1,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "build_ms": round(build_ms, 1),
+        "network_fetches": network_fetches,
+        "pages": per_page,
+        "totals": totals,
+    }
+
+
+def load_budget_rules(path: str) -> List[str]:
+    """Rules from a budgets file: a JSON list (or {"budgets": [...]}) or one rule per line (# comments)."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith(("[", "{")):
+        data = json.loads(text)
+        rules = data.get("budgets", []) if isinstance(data, dict) else data
+        return [str(r) for r in rules]
+    return [ln.strip() for ln in text.splitlines() if ln.strip() and not ln.strip().startswith("#")]
+
+
+def _format_budget_value(metric: str, value: float) -> str:
+    if metric in _SIZE_METRICS:
+        return "{:.1f} KB".format(value / 1024)
+    if metric == "build_ms":
+        return "{:.0f} ms".format(value)
+    return "{:g}".format(value)
+
+
+def check_budgets(report: dict, rules: List[str], previous: Optional[dict] = None) -> List[dict]:
+    """Evaluate `rules` against `report`: one result per (rule, matched page).
+
+    Results carry rule/target/metric/value/limit/ok, plus `previous` (the same number in
+    the last report) when there is one. A rule that does not parse, or names an unknown
+    metric or no page, raises SystemExit.
+    """
+    results: List[dict] = []
+    prev_pages = (previous or {}).get("pages") or {}
+    for rule in rules:
+        m = _BUDGET_RULE_RE.match(rule)
+        if not m:
+            raise SystemExit("无法解析性能预算：{!r}（示例：\"papers.html gzip <= 40 KB\"）".format(rule))
+        target = m.group("target")
+        if m.group("metric") and m.group("metric2"):
+            raise SystemExit("性能预算写了两个指标：{!r}（指标写在 <= 之前或数值之后，二选一）".format(rule))
+        metric_name = (m.group("metric") or m.group("metric2") or "").lower()
+        unit_name = (m.group("unit") or "").lower()
+        if not metric_name and target.lower() in _BUILD_METRICS:
+            metric = _BUILD_METRICS[target.lower()]
+            checks = [(metric, report.get(metric, 0), (previous or {}).get(metric))]
+        else:
+            metric = _BUDGET_METRICS.get(metric_name or "raw")
+            if metric is None:
+                raise SystemExit("性能预算中的指标未知：{!r}（可用：{}）".format(rule, ", ".join(sorted(_BUDGET_METRICS))))
+            if target.lower() == "total":
+                if metric not in _SIZE_METRICS:
+                    raise SystemExit("total 只支持 raw / gzip / minified：{!r}".format(rule))
+                checks = [("total", report["totals"][metric], ((previous or {}).get("totals") or {}).get(metric))]
+            else:
+                names = [nm for nm in report["pages"] if fnmatch.fnmatch(nm, target)]
+                if not names:
+                    raise SystemExit("性能预算没有匹配任何页面：{!r}".format(rule))
+                checks = [(nm, report["pages"][nm][metric], (prev_pages.get(nm) or {}).get(metric)) for nm in names]
+        if metric in _SIZE_METRICS:
+            fits = unit_name in _SIZE_UNITS + ("",)
+        elif metric == "build_ms":
+            fits = unit_name in _TIME_UNITS + ("",)
+        else:
+            fits = not unit_name
+        if not fits:
+            raise SystemExit("性能预算的单位与指标 {} 不符：{!r}（大小用 B/KB/MB，build_ms 用 ms/s，计数不带单位）".format(
+                metric, rule))
+        limit = float(m.group("num")) * _BUDGET_UNITS.get(unit_name or "b", 1)
+        for where, value, prev in checks:
+            results.append({"rule": rule, "target": where, "metric": metric, "value": value,
+                            "limit": limit, "previous": prev, "ok": value <= limit})
+    return results
+
+
+def budget_failure_message(results: List[dict]) -> str:
+    """The diff printed when a build goes over budget: value vs limit, and vs the last report."""
+    lines = ["❌ 超出性能预算（{} 项）：".format(sum(1 for r in results if not r["ok"]))]
+    for r in results:
+        if r["ok"]:
+            continue
+        metric = r["metric"]
+        over = r["value"] - r["limit"]
+        line = "  {} {}: {} > {}（超出 {}".format(
+            r["target"], metric, _format_budget_value(metric, r["value"]),
+            _format_budget_value(metric, r["limit"]), _format_budget_value(metric, over))
+        if r["limit"]:
+            line += "，+{:.1f}%".format(100.0 * over / r["limit"])
+        line += "）"
+        if r.get("previous") is not None:
+            line += "  上次：{}".format(_format_budget_value(metric, r["previous"]))
+        lines.append(line + "    [{}]".format(r["rule"]))
+    return "\n".join(lines)
+
+
+def cached_ieee_xplore_metadata(paper_url: str) -> Optional[Dict[str, str]]:
+    """`fetch_ieee_xplore_metadata` backed by META_DISK_CACHE.
+
+    - Fresh entries (younger than `meta_cache_ttl`) are returned without any request.
+    - Stale entries are revalidated with If-None-Match / If-Modified-Since;
+      a 304 only refreshes the fetch time.
+    - If the network fails (or the page no longer parses), a stale entry is still used.
+    """
+    key = ieee_document_url(paper_url) or (paper_url or "").strip()
+    if not key:
+        return None
+
+    with trace_span("ieee_metadata", "net", url=key) as span:
+        return _cached_ieee_xplore_metadata(key, span)
+
+
+def _cached_ieee_xplore_metadata(key: str, span: Dict[str, object]) -> Optional[Dict[str, str]]:
+    ent = META_DISK_CACHE.get(key)
+    now = time.time()
+    if ent and now - float(ent.get("fetched_at") or 0) < meta_cache_ttl:
+        span["cache"] = "hit"
+        return dict(ent["meta"])
+
+    headers: Dict[str, str] = {}
+    if ent and ent.get("etag"):
+        headers["If-None-Match"] = ent["etag"]
+    if ent and ent.get("last_modified"):
+        headers["If-Modified-Since"] = ent["last_modified"]
+
+    info: Dict[str, object] = {}
+    try:
+        page = fetch_text(ieee_request_url(key), headers=headers, info=info,
+                          stop_after_line=IEEE_METADATA_MARKER, max_bytes=FETCH_MAX_BYTES)
+    except Exception:
+        page = ""
+
+    if ent and info.get("status") == 304:
+        ent["fetched_at"] = now
+        span["cache"] = "revalidated"
+        return dict(ent["meta"])
+
+    meta = parse_ieee_xplore_page(page, key)
+    if meta and meta.get("title"):
+        META_DISK_CACHE[key] = {
+            "meta": meta,
+            "fetched_at": now,
+            "etag": info.get("etag") or "",
+            "last_modified": info.get("last_modified") or "",
+        }
+        span["cache"] = "refreshed" if ent else "miss"
+        return meta
+    if ent:
+        span["cache"] = "stale"
+        return dict(ent["meta"])
+    span["cache"] = "failed"
+    return meta
+
+
+def prefetch_ieee_metadata(urls: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+    """Resolve many IEEE URLs at once through a bounded thread pool.
+
+    Per-host limits and spacing are enforced in `fetch_text`, so the pool size
+    only bounds how many lookups (incl. disk-cache hits) are in flight.
+    """
+    uniq = list(dict.fromkeys(urls))
+    workers = min(max(1, int(fetch_workers)), len(uniq))
+    if workers <= 1:
+        return {u: cached_ieee_xplore_metadata(u) for u in uniq}
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(cached_ieee_xplore_metadata, uniq))
+    return dict(zip(uniq, results))
+
+
+@traced("io")
 def ensure_bib_file(meta: Dict[str, str]) -> str:
     """Write BibTeX file (if possible) and return the relative path (./bibtex/xxx.bib)."""
     # If local BibTeX generation is disabled, still provide an *online* BibTeX
@@ -1622,20 +3280,18 @@ def ensure_bib_file(meta: Dict[str, str]) -> str:
         doc_id = ieee_doc_id(meta.get("url", ""))
         return ieee_bibtex_export_url(doc_id) if doc_id else ""
 
-    os.makedirs(BIB_DIR, exist_ok=True)
-
     authors = meta.get("authors_list") or []
     first_last = ""
     if authors:
         # Take surname of first author if possible
-        parts = [p for p in re.split(r"\s+", authors[0].strip()) if p]
+        parts = [p for p in _WS_RE.split(authors[0].strip()) if p]
         first_last = parts[-1] if parts else ""
 
     year = meta.get("year", "")
     title = meta.get("title", "")
     first_word = ""
     if title:
-        w = re.split(r"\s+", title.strip())
+        w = _WS_RE.split(title.strip())
         first_word = w[0] if w else ""
 
     key = safe_bib_key(first_last) + (year or "") + safe_bib_key(first_word)
@@ -1644,24 +3300,24 @@ def ensure_bib_file(meta: Dict[str, str]) -> str:
     bib_rel = f"./{BIB_DIR}/{key}.bib"
     bib_path = os.path.join(BIB_DIR, f"{key}.bib")
 
-    # Build bibtex author string in "First Last and First2 Last2" format
-    authors_full = ""
-    if authors:
-        authors_full = " and ".join([a.strip() for a in authors if a.strip()])
+    official = IEEE_BIBTEX.get(ieee_doc_id(meta.get("url", "")))
+    if official:
+        # IEEE's entry, re-keyed so citation keys do not depend on where the entry came from
+        m = _BIB_ENTRY_START_RE.search(official)
+        content = official[:m.start(2)] + key + official[m.end(2):]
+    else:
+        # Build bibtex author string in "First Last and First2 Last2" format
+        authors_full = ""
+        if authors:
+            authors_full = " and ".join([a.strip() for a in authors if a.strip()])
 
-    meta2 = dict(meta)
-    meta2["authors_full"] = authors_full
+        meta2 = dict(meta)
+        meta2["authors_full"] = authors_full
 
-    content = make_bibtex(meta2, key)
+        content = make_bibtex(meta2, key)
     # Write only if new or changed
     try:
-        old = ""
-        if os.path.exists(bib_path):
-            with open(bib_path, "r", encoding="utf-8", errors="ignore") as f:
-                old = f.read()
-        if old != content:
-            with open(bib_path, "w", encoding="utf-8") as f:
-                f.write(content)
+        write_output(bib_path, content)
     except Exception:
         # If writing fails, fall back to no bib.
         return ""
@@ -1669,6 +3325,114 @@ def ensure_bib_file(meta: Dict[str, str]) -> str:
     return bib_rel
 
 
+def _bib_entry_end(text: str, brace: int) -> int:
+    """Index of the brace closing the entry opened at text[brace] (quotes are plain text in BibTeX)."""
+    depth = 0
+    for m in _BIB_BRACE_RE.finditer(text, brace):
+        ch = m.group()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return -1
+
+
+def split_bibtex_entries(text: str) -> List[Tuple[str, str]]:
+    """[(key, entry)] for every @type{key, ...} in a BibTeX export (HTML <br> line breaks allowed)."""
+    text = html.unescape(_BR_TAG_RE.sub("\n", text or ""))
+    entries = []
+    pos = 0
+    while True:
+        m = _BIB_ENTRY_START_RE.search(text, pos)
+        if not m:
+            return entries
+        brace = text.index("{", m.start())
+        end = _bib_entry_end(text, brace)
+        if end == -1:
+            return entries
+        entry = "\n".join(ln.rstrip() for ln in text[m.start():end + 1].strip().splitlines() if ln.strip())
+        entries.append((m.group(2), entry + "\n"))
+        pos = end + 1
+
+
+def fetch_ieee_bibtex_batch(doc_ids: List[str]) -> Dict[str, str]:
+    """Official BibTeX for many IEEE documents: `bibtex_batch` record ids per downloadCitations request.
+
+    Entries are matched back by their key (IEEE uses the arnumber) or a document URL inside
+    them, and kept in META_DISK_CACHE next to the metadata, so later builds do not ask again.
+    """
+    found: Dict[str, str] = {}
+    missing = []
+    for doc_id in dict.fromkeys(d for d in doc_ids if d):
+        ent = META_DISK_CACHE.get(ieee_document_url(doc_id)) or {}
+        if ent.get("bibtex"):
+            found[doc_id] = ent["bibtex"]
+        else:
+            missing.append(doc_id)
+    if not missing:
+        return found
+
+    size = max(1, int(bibtex_batch))
+    batches = [missing[i:i + size] for i in range(0, len(missing), size)]
+
+    def _one(batch: List[str]) -> Dict[str, str]:
+        try:
+            text = fetch_text(ieee_request_url(ieee_bibtex_export_url(",".join(batch))))
+        except Exception:
+            return {}
+        got = {}
+        for key, entry in split_bibtex_entries(text):
+            if key not in batch:
+                m = _BIB_DOC_ID_RE.search(entry)
+                key = m.group(1) if m else key
+            if key in batch:
+                got[key] = entry
+        return got
+
+    workers = min(max(1, int(fetch_workers)), len(batches))
+    if workers <= 1:
+        results = [_one(b) for b in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_one, batches))
+    fetched = {k: v for r in results for k, v in r.items()}
+    for doc_id, entry in fetched.items():
+        ent = META_DISK_CACHE.get(ieee_document_url(doc_id))
+        if ent is not None:
+            ent["bibtex"] = entry
+    print('📚 批量 BibTeX：{} 篇，{} 次请求，获取 {} 条'.format(len(missing), len(batches), len(fetched)))
+    found.update(fetched)
+    return found
+
+
+def write_bibtex_bundle(pub_md: str, path: str = os.path.join(BIB_DIR, "all.bib")) -> int:
+    """Concatenate the local .bib files linked from the publications section into one file.
+
+    Entries keep the section's order; returns how many were bundled.
+    """
+    entries = []
+    seen = set()
+    for ln in pub_md.split("\n"):
+        if not _BULLET_PREFIX_RE.match(ln):
+            continue
+        bib = parse_pub_line(ln).get("bib", "")
+        if not bib or urlparse(bib).scheme:
+            continue
+        bib_path = os.path.normpath(bib.lstrip("/"))
+        if bib_path in seen or os.path.abspath(bib_path) == os.path.abspath(path):
+            continue
+        seen.add(bib_path)
+        try:
+            entries.append(read_output(bib_path).strip() + "\n")
+        except OSError:
+            continue
+    if entries and write_output(path, "\n".join(entries)):
+        print('📚 汇总 BibTeX：{}（{} 条）'.format(path, len(entries)))
+    return len(entries)
+
+
 def autofill_publications(md_text: str, section_title: str = PUB_SECTION_TITLE) -> Tuple[str, bool]:
     """Replace URL-only pub bullets in the Selected Publications section with filled entries.
 
@@ -1681,13 +3445,30 @@ def autofill_publications(md_text: str, section_title: str = PUB_SECTION_TITLE)
     fm, body = split_front_matter_raw(md_text)
     lines = body.splitlines()
 
+    def _url_only_items():
+        in_sec = False
+        for ln in lines:
+            h = _H2_RE.match(ln.strip())
+            if h:
+                in_sec = (h.group(1).strip() == section_title)
+                continue
+            if in_sec:
+                m = _URL_ONLY_ITEM_RE.match(ln)
+                if m and is_ieee_xplore_url(m.group(2).strip()):
+                    yield m.group(2).strip()
+
+    # Resolve all metadata up front (concurrently); the rewrite below stays serial and in order.
+    cache: Dict[str, Optional[Dict[str, str]]] = prefetch_ieee_metadata(list(_url_only_items()))
+    if bibtex_autogen and bibtex_batch > 0:
+        IEEE_BIBTEX.update(fetch_ieee_bibtex_batch(
+            [ieee_doc_id(u) for u, meta in cache.items() if meta and meta.get("title")]))
+
     out = []
     in_target = False
     changed = False
-    cache: Dict[str, Optional[Dict[str, str]]] = {}
 
     for ln in lines:
-        h = re.match(r"^\s*##\s+(.*)$", ln.strip())
+        h = _H2_RE.match(ln.strip())
         if h:
             in_target = (h.group(1).strip() == section_title)
             out.append(ln)
@@ -1695,19 +3476,19 @@ def autofill_publications(md_text: str, section_title: str = PUB_SECTION_TITLE)
 
         if in_target:
             # URL-only list item
-            m = re.match(r"^(\s*[-*]\s+)(https?://\S+)\s*$", ln)
+            m = _URL_ONLY_ITEM_RE.match(ln)
             if m:
                 prefix, url = m.group(1), m.group(2).strip()
                 if is_ieee_xplore_url(url):
                     if url not in cache:
-                        cache[url] = fetch_ieee_xplore_metadata(url)
+                        cache[url] = cached_ieee_xplore_metadata(url)
                     meta = cache[url]
                     if meta:
                         PUB_META_CACHE[url] = meta
                         # also cache under normalized document URL
-                        _docid = ieee_doc_id(url)
-                        if _docid:
-                            PUB_META_CACHE[f"https://ieeexplore.ieee.org/document/{_docid}"] = meta
+                        _doc_url = ieee_document_url(url)
+                        if _doc_url:
+                            PUB_META_CACHE[_doc_url] = meta
                     if meta and meta.get("title"):
                         authors_text = format_authors(meta.get("authors_list") or [])
                         venue = (meta.get("venue") or "").strip()
@@ -1743,12 +3524,12 @@ def parse_pub_line(line: str) -> Dict[str, str]:
     Format:
       - Title | Authors(optional) | Venue Year(optional) | PDF: url | BibTeX: url | Code: url
     """
-    s = re.sub(r"^\s*[-*]\s+", "", line.strip())
+    s = _BULLET_PREFIX_RE.sub("", line.strip())
     parts = [p.strip() for p in s.split("|") if p.strip()]
 
     # Allow a minimal form: '- https://...'
     # (If auto-fill failed or for non-IEEE links, we still render a usable PDF button.)
-    if len(parts) == 1 and re.match(r"^https?://", parts[0], flags=re.I):
+    if len(parts) == 1 and _HTTP_PREFIX_RE.match(parts[0]):
         url_only = parts[0].strip()
         return {
             "title": url_only,
@@ -1788,7 +3569,7 @@ def parse_pub_line(line: str) -> Dict[str, str]:
     # Split venue/year if possible
     venue = venue_year
     year = ""
-    m = re.search(r"(19|20)\d{2}", venue_year)
+    m = _YEAR_RE.search(venue_year)
     if m:
         year = m.group(0)
         venue = venue_year.replace(year, "").strip().strip("-").strip("·").strip()
@@ -1814,14 +3595,21 @@ def pub_sort_key(p: Dict[str, str]) -> Tuple[int, int, int]:
       3) If marked as Early Access, push it ahead of non-early-access entries within the same year.
     Returns (year, month, day), used with reverse=True.
     """
+    return pub_sort_data(p)[3]
+
+
+def pub_sort_data(p: Dict[str, str]) -> Tuple[str, Optional[Tuple[int, int, int]], bool, Tuple[int, int, int]]:
+    """Resolve (IEEE doc id, parsed date, early-access flag, sort key) for a parsed pub line.
+
+    See `pub_sort_key` for the ordering rules.
+    """
     pdf_url = (p.get("pdf") or "").strip()
+    doc_id = ieee_doc_id(pdf_url) if pdf_url else ""
 
     # 1) Cached IEEE metadata
     meta = PUB_META_CACHE.get(pdf_url) if pdf_url else None
-    if (not meta) and pdf_url:
-        _docid = ieee_doc_id(pdf_url)
-        if _docid:
-            meta = PUB_META_CACHE.get(f"https://ieeexplore.ieee.org/document/{_docid}")
+    if (not meta) and doc_id:
+        meta = PUB_META_CACHE.get(ieee_document_url(doc_id))
     if meta:
         pubdate = (meta.get("pubdate") or "").strip()
         is_ea = str(meta.get("is_early_access") or "").strip().lower() in ("true", "1", "yes")
@@ -1833,12 +3621,12 @@ def pub_sort_key(p: Dict[str, str]) -> Tuple[int, int, int]:
             y, mo, d = dt
             if is_ea:
                 # Make Early Access slightly ahead within the same date bucket.
-                return (y, mo, d + 1 if d < 31 else d)
-            return (y, mo, d)
+                return doc_id, dt, is_ea, (y, mo, d + 1 if d < 31 else d)
+            return doc_id, dt, is_ea, (y, mo, d)
 
         # No parseable date: fall back to year but keep EA ahead
         y = 0
-        m = re.search(r"(19|20)\d{2}", pubdate)
+        m = _YEAR_RE.search(pubdate)
         if m:
             y = int(m.group(0))
         if y == 0:
@@ -1846,8 +3634,8 @@ def pub_sort_key(p: Dict[str, str]) -> Tuple[int, int, int]:
             if year_s.isdigit():
                 y = int(year_s)
         if is_ea:
-            return (y if y else 9999, 99, 99)
-        return (y, 0, 0)
+            return doc_id, None, is_ea, (y if y else 9999, 99, 99)
+        return doc_id, None, is_ea, (y, 0, 0)
 
     # 2) Fallback: parse from the publication line itself
     y = 0
@@ -1864,54 +3652,83 @@ def pub_sort_key(p: Dict[str, str]) -> Tuple[int, int, int]:
     if dt2:
         y, mo, d = dt2
     elif y == 0:
-        m = re.search(r"(19|20)\d{2}", venue_text)
+        m = _YEAR_RE.search(venue_text)
         if m:
             y = int(m.group(0))
 
     # Early Access heuristic (if it appears anywhere)
     if "early access" in venue_text.lower():
-        return (y if y else 9999, 99, 99)
+        return doc_id, dt2, True, (y if y else 9999, 99, 99)
+
+    return doc_id, dt2, False, (y, mo, d)
+
+
+class Publication:
+    """A parsed publication bullet with its sort data resolved once.
+
+    Built from `parse_pub_line`; the IEEE doc id, date, Early Access flag and
+    sort key are computed at construction, so sorting never re-runs the regexes,
+    PUB_META_CACHE lookups or date parsing.
+    """
 
-    return (y, mo, d)
+    __slots__ = ("title", "authors", "venue", "year", "pdf", "bib", "code",
+                 "doc_id", "date", "early_access", "sort_key")
+
+    def __init__(self, fields: Dict[str, str]) -> None:
+        self.title = fields.get("title", "")
+        self.authors = fields.get("authors", "")
+        self.venue = fields.get("venue", "")
+        self.year = fields.get("year", "")
+        self.pdf = fields.get("pdf", "")
+        self.bib = fields.get("bib", "")
+        self.code = fields.get("code", "")
+        self.doc_id, self.date, self.early_access, self.sort_key = pub_sort_data(fields)
+
+    @classmethod
+    def from_line(cls, line: str) -> "Publication":
+        return cls(parse_pub_line(line))
 
 
 def render_publications(md: str) -> str:
     lines = [ln.strip() for ln in md.split("\n") if ln.strip()]
     pub_lines = [ln for ln in lines if ln.startswith("-") or ln.startswith("*")]
 
-    pubs = [parse_pub_line(ln) for ln in pub_lines]
+    pubs = [Publication.from_line(ln) for ln in pub_lines]
 
-    # Sort: newer first (stable for ties)
-    pubs = sorted(pubs, key=pub_sort_key, reverse=True)
+    # Sort: newer first (stable for ties). Decorate-sort-undecorate on the precomputed
+    # keys; -index keeps the original order of ties under reverse=True.
+    decorated = [(p.sort_key, -i, p) for i, p in enumerate(pubs)]
+    decorated.sort(reverse=True)
+    pubs = [p for _key, _i, p in decorated]
 
     blocks: List[str] = []
 
     for i, p in enumerate(pubs, start=1):
         links = []
-        if p["pdf"]:
-            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">PDF</a>'.format(esc(p["pdf"])))
-        if p["bib"]:
-            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">BibTeX</a>'.format(esc(p["bib"])))
-        if p.get("code"):
-            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">Code</a>'.format(esc(p["code"])))
+        if p.pdf:
+            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">PDF</a>'.format(esc(p.pdf)))
+        if p.bib:
+            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">BibTeX</a>'.format(esc(p.bib)))
+        if p.code:
+            links.append('<a class="pill" href="{0}" target="_blank" rel="noopener">Code</a>'.format(esc(p.code)))
 
         venue_text = ""
-        if p["venue"] and p["year"]:
-            venue_text = "{} · {}".format(p["venue"], p["year"])
+        if p.venue and p.year:
+            venue_text = "{} · {}".format(p.venue, p.year)
         else:
-            venue_text = p["venue"] or p["year"] or ""
+            venue_text = p.venue or p.year or ""
 
         blocks.append(
             "\n".join([
                 '<div class="pub">',
                 '  <div class="idx">[{}]</div>'.format(i),
                 '  <div class="content">',
-                '    <p class="ptitle">{}</p>'.format(esc(p["title"])),
+                '    <p class="ptitle">{}</p>'.format(esc(p.title)),
                 ('    <div class="meta-line">'
-                 + ('<span class="authors-text">{}</span>'.format(allow_strong_only(bold_author_in_authors_str(p["authors"], highlight_author))) if p["authors"] else '')
+                 + ('<span class="authors-text">{}</span>'.format(allow_strong_only(bold_author_in_authors_str(p.authors, highlight_author))) if p.authors else '')
                  + ('<span class="venue-badge">{}</span>'.format(allow_strong_only(venue_text)) if venue_text else '')
                  + '</div>'
-                 if (p["authors"] or venue_text) else ''),
+                 if (p.authors or venue_text) else ''),
                 ('    <div class="links">{}</div>'.format("".join(links)) if links else ""),
                 "  </div>",
                 "</div>",
@@ -1921,6 +3738,47 @@ def render_publications(md: str) -> str:
     return "\n".join(blocks)
 
 
+# Rendered CV.md sections, shared by index.html and every Mode A page of one build:
+# (title, body hash) -> section HTML. Reset by build_site().
+SECTION_FRAGMENT_CACHE: Dict[Tuple[str, str, str], str] = {}
+FRAGMENT_CACHE_STATS = {"hits": 0, "misses": 0}
+# The publications fragment also depends on highlight_author and the IEEE metadata used for
+# sorting; build_site sets this to a hash of both so a long-lived cache never serves stale cards.
+pub_fragment_salt = ""
+
+
+def reset_fragment_cache(keep: bool = False) -> None:
+    """Start a build. With `keep` (watch mode) fragments from earlier builds stay usable."""
+    if not keep:
+        SECTION_FRAGMENT_CACHE.clear()
+    FRAGMENT_CACHE_STATS["hits"] = 0
+    FRAGMENT_CACHE_STATS["misses"] = 0
+
+
+def render_cv_section(title: str, body: str) -> str:
+    """Render one CV.md '##' section (publications get the pub-card renderer).
+
+    Each (title, body) is rendered once per build; pages that show the same
+    section reuse the cached fragment.
+    """
+    is_pub = title.strip() == PUB_SECTION_TITLE
+    key = (title, content_hash(body), pub_fragment_salt if is_pub else "")
+    cached = SECTION_FRAGMENT_CACHE.get(key)
+    if cached is not None:
+        FRAGMENT_CACHE_STATS["hits"] += 1
+        return cached
+    FRAGMENT_CACHE_STATS["misses"] += 1
+    if is_pub:
+        frag = section_html(title, render_publications(body))
+    else:
+        frag = section_html(title, render_simple_md(body))
+    # One fragment per title: older versions of this section can never be hit again
+    for old in [k for k in SECTION_FRAGMENT_CACHE if k[0] == title]:
+        del SECTION_FRAGMENT_CACHE[old]
+    SECTION_FRAGMENT_CACHE[key] = frag
+    return frag
+
+
 def section_html(title: str, inner_html: str) -> str:
     return "\n".join([
         "<section>",
@@ -1937,105 +3795,511 @@ def allow_strong_only(s: str) -> str:
     return x
 
 
-def bold_author_in_authors_str(authors: str, highlight: str) -> str:
-    """Bold user's name in an authors string.
-    - Case-insensitive
-    - Works for 'C. Luo', 'Cheng Luo', 'Luo, C.', 'Luo C.' etc. by token match
-    - Uses <strong>...</strong> so our renderer can safely allow it.
+@functools.lru_cache(maxsize=8)
+def author_highlight_patterns(highlight: str) -> Tuple[Pattern, ...]:
+    """Compile the match cascade for one highlight name (once per build, not per author list).
+
+    Patterns are tried in order; the first one that matches anything wins.
     """
-    authors = authors or ""
     highlight = (highlight or "").strip()
-    if not authors or not highlight:
-        return authors
 
     # Normalize highlight tokens
-    def norm_tokens(s: str):
-        s = re.sub(r"[\.,;:()\[\]{}]", " ", s)
-        s = s.replace("-", " ")
-        toks = [t for t in s.split() if t]
-        return toks
-
-    h_toks = norm_tokens(highlight)
-    if not h_toks:
-        return authors
-
-    # Build a few common patterns to match
-    # 1) Exact substring match (case-insensitive)
-    def repl(m):
-        return f"<strong>{m.group(0)}</strong>"
+    s = _AUTHOR_PUNCT_RE.sub(" ", highlight)
+    s = s.replace("-", " ")
+    h_toks = [t for t in s.split() if t]
+    if not highlight or not h_toks:
+        return ()
 
-    out = authors
+    pats: List[str] = []
 
-    # First, try exact highlight string
-    out2 = re.sub(re.escape(highlight), repl, out, flags=re.I)
-    if out2 != out:
-        return out2
+    # 1) Exact substring match (case-insensitive)
+    pats.append(re.escape(highlight))
 
-    # Otherwise, try matching tokens in order (allow optional dots/spaces)
+    # 2) Tokens in order (allow optional dots/spaces)
     # e.g., highlight "C. Luo" -> match "C. Luo", "C Luo", "C.Luo"
     # e.g., highlight "Cheng Luo" -> match "Cheng Luo"
     tok_pat = r"\s*\.?\s*".join([re.escape(t) for t in h_toks])
-    tok_pat = r"\b" + tok_pat + r"\b"
-    out2 = re.sub(tok_pat, repl, out, flags=re.I)
-    if out2 != out:
-        return out2
+    pats.append(r"\b" + tok_pat + r"\b")
 
-    # Finally, handle 'Last, F.' pattern if highlight looks like 'First Last' or 'F. Last'
+    # 3) 'Last, First' / 'Last, F.' if highlight looks like 'First Last' or 'F. Last'
     if len(h_toks) >= 2:
         first = h_toks[0]
         last = h_toks[-1]
-        # Match 'Last, First' or 'Last, F'
-        pat = rf"\b{re.escape(last)}\s*,\s*{re.escape(first)}\b"
-        out2 = re.sub(pat, repl, out, flags=re.I)
-        if out2 != out:
-            return out2
-        pat = rf"\b{re.escape(last)}\s*,\s*{re.escape(first[0])}\.?\b"
-        out2 = re.sub(pat, repl, out, flags=re.I)
-        if out2 != out:
-            return out2
+        pats.append(rf"\b{re.escape(last)}\s*,\s*{re.escape(first)}\b")
+        pats.append(rf"\b{re.escape(last)}\s*,\s*{re.escape(first[0])}\.?\b")
 
-
-    # If highlight is like 'C. Luo' (initial + last), also match full first name 'Cheng Luo'
+    # 4) If highlight is like 'C. Luo' (initial + last), also match full first name 'Cheng Luo'
     if len(h_toks) == 2 and len(h_toks[0]) == 1:
         ini = re.escape(h_toks[0])
         last = re.escape(h_toks[1])
-        pat = rf"\b{ini}[A-Za-z\-]*\s+{last}\b"
-        out2 = re.sub(pat, repl, out, flags=re.I)
-        if out2 != out:
-            return out2
-        pat = rf"\b{last}\s+{ini}[A-Za-z\-]*\b"
-        out2 = re.sub(pat, repl, out, flags=re.I)
-        if out2 != out:
+        pats.append(rf"\b{ini}[A-Za-z\-]*\s+{last}\b")
+        pats.append(rf"\b{last}\s+{ini}[A-Za-z\-]*\b")
+
+    return tuple(re.compile(p, flags=re.I) for p in pats)
+
+
+def bold_author_in_authors_str(authors: str, highlight: str) -> str:
+    """Bold user's name in an authors string.
+    - Case-insensitive
+    - Works for 'C. Luo', 'Cheng Luo', 'Luo, C.', 'Luo C.' etc. by token match
+    - Uses <strong>...</strong> so our renderer can safely allow it.
+    """
+    authors = authors or ""
+    highlight = (highlight or "").strip()
+    if not authors or not highlight:
+        return authors
+
+    def repl(m):
+        return f"<strong>{m.group(0)}</strong>"
+
+    for pat in author_highlight_patterns(highlight):
+        out2 = pat.sub(repl, authors)
+        if out2 != authors:
             return out2
 
+    return authors
+
+
+# -----------------------------
+# --profile: per-function wall time
+# -----------------------------
+PROFILED_FUNCTIONS = (
+    "parse_front_matter",
+    "split_sections",
+    "autofill_publications",
+    "fetch_text",
+    "parse_pub_line",
+    "parse_pubdate_to_tuple",
+    "pub_sort_data",
+    "render_publications",
+    "render_simple_md",
+    "md_inline_to_html",
+    "bold_author_in_authors_str",
+    "sanitize_url",
+    "meta_index",
+)
+# name -> [calls, seconds]
+_PROFILE_STATS: Dict[str, List[float]] = {}
+# render_page is a closure in build_site: it records itself into _PROFILE_STATS["render_page"]
+# (from the page threads, hence the lock)
+_PROFILE_LOCK = threading.Lock()
+
+
+def enable_profiling() -> None:
+    """Wrap PROFILED_FUNCTIONS with timers (module globals are looked up at call time)."""
+    g = globals()
+    for name in PROFILED_FUNCTIONS:
+        fn = g[name]
+        if name in _PROFILE_STATS:
+            continue
+        stats = _PROFILE_STATS[name] = [0, 0.0]
 
-    return out
+        def timed(*a, _fn=fn, _stats=stats, **kw):
+            t0 = time.perf_counter()
+            try:
+                return _fn(*a, **kw)
+            finally:
+                _stats[0] += 1
+                _stats[1] += time.perf_counter() - t0
+
+        g[name] = functools.wraps(fn)(timed)
+    _PROFILE_STATS.setdefault("render_page", [0, 0.0])
+
+
+def print_profile() -> None:
+    rows = sorted(_PROFILE_STATS.items(), key=lambda kv: kv[1][1], reverse=True)
+    print("⏱️ --profile（累计耗时，含嵌套调用）")
+    print("  {:<28} {:>8} {:>11} {:>10}".format("function", "calls", "total ms", "µs/call"))
+    for name, (calls, secs) in rows:
+        per = secs / calls * 1e6 if calls else 0.0
+        print("  {:<28} {:>8} {:>11.2f} {:>10.1f}".format(name, int(calls), secs * 1000, per))
+
+
+def watch_snapshot(md_path: str = "CV.md") -> Dict[str, Tuple[int, int]]:
+    """{path: (mtime_ns, size)} for every input watch mode reacts to."""
+    paths = [md_path]
+    for folder, suffix in ((CONTENT_DIR, ".content.html"), (BIB_DIR, ".bib")):
+        for root, _dirs, files in os.walk(folder):
+            paths += [os.path.join(root, fn) for fn in files if fn.endswith(suffix)]
+    snap = {}
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        snap[p] = (st.st_mtime_ns, st.st_size)
+    return snap
 
 
-def main():
-    md_path = "CV.md"
-    out_path = "index.html"
+def _inotify_waiter(md_path: str):
+    """wait(timeout_s) blocking on inotify events (inotify_simple, optional), or None to poll.
 
+    Folders created later are not watched, but the caller re-checks a snapshot after every
+    timeout anyway, so they are still noticed (just not instantly).
+    """
+    try:
+        from inotify_simple import INotify, flags  # type: ignore
+    except ImportError:
+        return None
+    ino = INotify()
+    mask = flags.CLOSE_WRITE | flags.MODIFY | flags.CREATE | flags.DELETE | flags.MOVED_TO | flags.MOVED_FROM
+    ino.add_watch(os.path.dirname(os.path.abspath(md_path)), mask)
+    for folder in (CONTENT_DIR, BIB_DIR):
+        for root, _dirs, _files in os.walk(folder):
+            ino.add_watch(root, mask)
+
+    def wait(timeout: float) -> None:
+        ino.read(timeout=int(timeout * 1000))
+    return wait
+
+
+def watch_build(md_path: str, build) -> Dict[str, Tuple[int, int]]:
+    """Run build() and return the snapshot the next change check compares against.
+
+    That is the snapshot taken *before* the build, so an input saved while it runs still
+    counts as a change; only files the build wrote itself, and which still hold exactly
+    what it wrote, are taken from a second snapshot after it.
+    """
+    global build_writes
+    before = watch_snapshot(md_path)
+    build_writes = {}
+    try:
+        build()
+    finally:
+        writes, build_writes = build_writes, None
+    snap = dict(before)
+    for p, st in watch_snapshot(md_path).items():
+        h = writes.get(os.path.normpath(p))
+        if h is None or st == before.get(p):
+            continue
+        try:
+            with open(p, "r", encoding="utf-8", errors="ignore") as f:
+                if content_hash(f.read()) == h:
+                    snap[p] = st
+        except OSError:
+            continue
+    return snap
+
+
+def watch_site(md_path: str = "CV.md", interval: float = 0.25, render_workers: Optional[int] = None,
+               force: bool = False) -> None:
+    """Rebuild whenever CV.md, _content/*.content.html or bibtex/*.bib change (Ctrl+C to stop)."""
+    state: Dict[str, object] = {}
+    snap = watch_build(md_path, lambda: build_site(md_path=md_path, force=force,
+                                                   render_workers=render_workers, state=state))
+    wait = _inotify_waiter(md_path)
+    print('👀 正在监视 {}、{}/、{}/（{}，Ctrl+C 退出）'.format(
+        md_path, CONTENT_DIR, BIB_DIR, "inotify" if wait else "轮询 {:.2f}s".format(interval)))
+    try:
+        while True:
+            if wait:
+                wait(max(interval, 1.0))
+            else:
+                time.sleep(interval)
+            new_snap = watch_snapshot(md_path)
+            if new_snap == snap:
+                continue
+            changed = sorted(p for p in set(snap) | set(new_snap) if snap.get(p) != new_snap.get(p))
+            print('🔄 检测到变化：{}'.format("、".join(changed)))
+            t0 = time.perf_counter()
+
+            def rebuild() -> None:
+                try:
+                    build_site(md_path=md_path, render_workers=render_workers, state=state)
+                except (Exception, SystemExit) as e:
+                    # Keep watching: the next save may fix it
+                    print('❌ 构建失败：{}'.format(e))
+            snap = watch_build(md_path, rebuild)
+            print('⚡ 重建耗时 {:.1f} ms'.format((time.perf_counter() - t0) * 1000))
+    except KeyboardInterrupt:
+        print('👋 已停止监视')
+
+
+_PAGE_REF_RE = re.compile(r'\b(?:src|href|srcset)="([^"]*)"')
+
+
+def page_local_refs(href: str, page: str) -> List[str]:
+    """Normalized local paths a rendered page links to (src / href / srcset), relative to the site root."""
+    base = os.path.dirname(href)
+    refs = []
+    for m in _PAGE_REF_RE.finditer(page):
+        for cand in html.unescape(m.group(1)).split(","):
+            parts = cand.split()
+            if not parts:
+                continue
+            pu = urlparse(parts[0])
+            if pu.scheme or pu.netloc or not pu.path:
+                continue
+            refs.append(os.path.normpath(os.path.join(base, unquote(pu.path).lstrip("/"))))
+    return refs
+
+
+def serve_site(host: str = "127.0.0.1", port: int = 8000, md_path: str = "CV.md",
+               render_workers: Optional[int] = None) -> None:
+    """Preview server: pages are rendered into memory (again only when an input changed) and
+    served with ETag/304 and gzip; other files come from disk via sendfile. Nothing is written.
+
+    Only files the pages link to, and the asset/BibTeX folders, are served from disk:
+    never CV.md, the caches, dotfiles or the rest of the working tree.
+    """
+    state: Dict[str, object] = {}
+    # pages: {href: (etag, body, gzipped body)}; files: local paths the pages link to
+    site: Dict[str, object] = {"snap": None, "pages": {}, "files": set()}
+    lock = threading.Lock()
+
+    def current_pages() -> Dict[str, Tuple[str, bytes, bytes]]:
+        with lock:
+            snap = watch_snapshot(md_path)
+            if snap != site["snap"]:
+                rendered = build_site(md_path=md_path, render_workers=render_workers, state=state, write=False)
+                old_pages = site["pages"]
+                pages = {}
+                for href, text in (rendered or {}).items():
+                    etag = '"{}"'.format(content_hash(text))
+                    old = old_pages.get(href)
+                    if old and old[0] == etag:
+                        pages[href] = old
+                    else:
+                        data = text.encode("utf-8")
+                        pages[href] = (etag, data, gzip.compress(data, compresslevel=6, mtime=0))
+                site["files"] = {p for href, text in (rendered or {}).items() if href.endswith(".html")
+                                 for p in page_local_refs(href, text)}
+                # The snapshot from before the build: an edit saved while it rendered is picked up by
+                # the next request (an in-memory build writes none of the watched inputs itself)
+                site["pages"], site["snap"] = pages, snap
+            return site["pages"]
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt: str, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            self._serve(head=False)
+
+        def do_HEAD(self) -> None:
+            self._serve(head=True)
+
+        def _not_modified(self, etag: str) -> bool:
+            tags = [t.strip() for t in (self.headers.get("If-None-Match") or "").split(",")]
+            if etag not in tags and "*" not in tags:
+                return False
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return True
+
+        def _serve(self, head: bool) -> None:
+            rel = unquote(urlparse(self.path).path).lstrip("/")
+            if not rel or rel.endswith("/"):
+                rel += "index.html"
+            try:
+                pages = current_pages()
+            except (Exception, SystemExit) as e:
+                self.send_error(500, "build failed: {}".format(e))
+                return
+
+            page = pages.get(rel)
+            if page is not None:
+                etag, data, gz = page
+                if self._not_modified(etag):
+                    return
+                use_gz = "gzip" in (self.headers.get("Accept-Encoding") or "")
+                body = gz if use_gz else data
+                ctype = mimetypes.guess_type(rel)[0] or "text/html"
+                self.send_response(200)
+                self.send_header("Content-Type", ctype + "; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+                if use_gz:
+                    self.send_header("Content-Encoding", "gzip")
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+                return
+
+            path = os.path.normpath(rel)
+            parts = path.split(os.sep)
+            allowed = path in site["files"] or parts[0] in (ASSET_DIR, BIB_DIR)
+            if (not allowed or os.path.isabs(path) or any(p.startswith(".") for p in parts)
+                    or not os.path.isfile(path)):
+                self.send_error(404)
+                return
+            st = os.stat(path)
+            etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, st.st_size)
+            if self._not_modified(etag):
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(st.st_size))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if not head:
+                with open(path, "rb") as f:
+                    self.wfile.flush()
+                    self.connection.sendfile(f)  # zero-copy where the OS supports it
+
+    current_pages()
+    server = ThreadingHTTPServer((host, port), PreviewHandler)
+    print('🌐 预览服务：http://{}:{}/（页面在内存中渲染，改动后刷新即可；Ctrl+C 退出）'.format(host, server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('👋 已停止预览服务')
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global fetch_mode, FETCH_ARCHIVE_PATH
+    ap = argparse.ArgumentParser(description="Build index.html and nav pages from CV.md")
+    ap.add_argument("--force", action="store_true",
+                    help="ignore the build manifest and re-render every page")
+    ap.add_argument("--profile", action="store_true",
+                    help="report time spent in the parsing/rendering hot spots")
+    ap.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                    help="render and write pages with N threads (default: front matter render_workers, else 1)")
+    ap.add_argument("--watch", action="store_true",
+                    help="keep running and rebuild affected pages when CV.md, _content/ or bibtex/ change")
+    ap.add_argument("--interval", type=float, default=0.25, metavar="S",
+                    help="polling interval for --watch in seconds (default: 0.25)")
+    ap.add_argument("--serve", action="store_true",
+                    help="run a preview server that renders pages in memory (no files are written)")
+    ap.add_argument("--host", default="127.0.0.1", help="address for --serve (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8000, help="port for --serve (default: 8000)")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_true",
+                      help="fetch from the network and save every response to the fixtures archive")
+    mode.add_argument("--offline", action="store_true",
+                      help="never touch the network; replay responses from the fixtures archive")
+    ap.add_argument("--fixtures", metavar="PATH", default=None,
+                    help="fixtures archive for --record/--offline (default: {})".format(FETCH_ARCHIVE_PATH))
+    ap.add_argument("--report", metavar="PATH", default=None,
+                    help="write a JSON build report (page sizes raw/gzip/minified, DOM nodes, inline scripts/styles, build time, fetches)")
+    ap.add_argument("--budgets", metavar="FILE", default=None,
+                    help="performance budgets to enforce (JSON list or one rule per line), in addition to front matter 'budgets'")
+    ap.add_argument("--trace", metavar="PATH", default=None,
+                    help="write a Chrome trace-event file (stages, fetches, page renders) for Perfetto")
+    args = ap.parse_args(argv)
+    if args.fixtures:
+        FETCH_ARCHIVE_PATH = args.fixtures
+    fetch_mode = "record" if args.record else "offline" if args.offline else "live"
+    if args.profile:
+        enable_profiling()
+    if args.trace:
+        enable_tracing()
+    try:
+        with trace_span("main", fetch_mode=fetch_mode):
+            if args.serve:
+                serve_site(host=args.host, port=args.port, render_workers=args.jobs)
+            elif args.watch:
+                watch_site(interval=args.interval, render_workers=args.jobs, force=args.force)
+            else:
+                build_site(force=args.force, render_workers=args.jobs,
+                           report_path=args.report, budgets_path=args.budgets)
+            if fetch_mode == "record":
+                with trace_span("save_fetch_archive", "io"):
+                    save_fetch_archive()
+    finally:
+        if args.trace:
+            save_trace(args.trace)
+    if args.profile:
+        print_profile()
+
+
+@traced()
+def build_site(md_path: str = "CV.md", out_path: str = "index.html", force: bool = False,
+               render_workers: Optional[int] = None, state: Optional[Dict[str, object]] = None,
+               write: bool = True, report_path: Optional[str] = None,
+               budgets_path: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """Build index.html and the nav pages from `md_path`.
+
+    `state` (watch mode) is a dict kept between calls: the last manifest, parsed front
+    matter/sections and the loaded metadata cache stay in memory, and section fragments
+    are reused, so a rebuild only redoes what the edit touched.
+
+    With `write=False` (preview server) every page is rendered but nothing is written:
+    no pages, manifest, bundle, precompressed or BibTeX files, no _content placeholders,
+    image variants or caches, and no writeback to CV.md (see `preview_outputs`).
+    Returns {href: text} (asset bundle and BibTeX files included) in that case, else None.
+
+    `report_path` writes the build report (see `build_report`); budgets from front matter
+    'budgets', 'budgets_file' or `budgets_path` are checked against it, and a page over
+    budget ends the build with SystemExit.
+    """
+    build_t0 = time.perf_counter()
+    fetches0 = pool_stats()["requests"]
+    rendered: Dict[str, str] = {}
+    global preview_outputs
+    preview_outputs = None if write else {}
+    reset_fragment_cache(keep=state is not None)
+
+    def memo(name: str, text: str, fn):
+        # fn(text), reused from the previous build while `text` is unchanged (watch mode)
+        if state is None:
+            return fn(text)
+        key = content_hash(text)
+        hit = state.get(name)
+        if hit and hit[0] == key:
+            return hit[1]
+        value = fn(text)
+        state[name] = (key, value)
+        return value
+
+    trace_stage("read CV.md")
     if not os.path.exists(md_path):
         raise SystemExit("找不到 CV.md，请确认它与 build_cv.py 在同一目录。")
 
     with open(md_path, "r", encoding="utf-8") as f:
         md_text = f.read()
+    source_hash = content_hash(md_text)
 
     # Read front matter early so settings affect autofill/writeback
-    meta0, _body0 = parse_front_matter(md_text)
+    meta0, _body0 = memo("front_matter", md_text, parse_front_matter)
     global highlight_author
-    global bibtex_autogen
+    global bibtex_autogen, bibtex_batch
     highlight_author = str(meta0.get("highlight_author", "")).strip()
     writeback_backup = as_bool(meta0.get("writeback_backup", True), True)
     writeback_enabled = as_bool(meta0.get("writeback_enabled", meta0.get("writeback", meta0.get("pub_writeback", meta0.get("writeback_md", True)))), True)
+    writeback_enabled = writeback_enabled and write
     bibtex_autogen = as_bool(meta0.get("bibtex_autogen", True), True)
-
-
-
+    bibtex_batch = int(as_float(meta0.get("bibtex_batch"), bibtex_batch))
+    global meta_cache_ttl, fetch_workers, fetch_per_host, fetch_interval, fetch_retries, fetch_backoff
+    meta_cache_ttl = as_float(meta0.get("meta_cache_ttl_days"), meta_cache_ttl / 86400.0) * 86400.0
+    fetch_workers = int(as_float(meta0.get("fetch_workers"), fetch_workers))
+    fetch_per_host = int(as_float(meta0.get("fetch_per_host"), fetch_per_host))
+    fetch_interval = as_float(meta0.get("fetch_interval"), fetch_interval)
+    fetch_retries = int(as_float(meta0.get("fetch_retries"), fetch_retries))
+    fetch_backoff = as_float(meta0.get("fetch_backoff"), fetch_backoff)
+
+    # Persistent IEEE metadata: reuse what earlier runs fetched, also for sorting
+    # publications whose lines were already expanded (and written back) before.
+    if state is None or not state.get("meta_cache_loaded"):
+        META_DISK_CACHE.update(load_meta_cache())
+        if state is not None:
+            state["meta_cache_loaded"] = True
+    for _url, _ent in META_DISK_CACHE.items():
+        PUB_META_CACHE.setdefault(_url, _ent["meta"])
+
+
+
+    trace_stage("autofill")
     # --- Auto-fill IEEE publications (URL-only bullets) and update CV.md in-place ---
     # If you wrote full info manually (with | Title | Authors | ...), we keep it as-is.
-    new_md_text, changed = autofill_publications(md_text, section_title=PUB_SECTION_TITLE)
+    # (In watch mode only when CV.md changed: an item that could not be resolved is not retried on every save.)
+    if state is None or state.get("autofill_src") != source_hash:
+        # Official BibTeX is per build: entries of papers removed since the last watch build must go
+        IEEE_BIBTEX.clear()
+        new_md_text, changed = autofill_publications(md_text, section_title=PUB_SECTION_TITLE)
+    else:
+        new_md_text, changed = md_text, False
+    if META_DISK_CACHE and write:
+        save_meta_cache(META_DISK_CACHE)
     if changed:
         md_text = new_md_text
     if changed:
@@ -2050,6 +4314,7 @@ def main():
                     bak = None
             if writeback_enabled:
                 try:
+                    note_build_write(md_path, md_text)
                     with open(md_path, 'w', encoding='utf-8') as f:
                         f.write(md_text)
                 except Exception as e:
@@ -2058,8 +4323,19 @@ def main():
                     print('📝 已自动补全 Selected Publications，并写回 CV.md' + (f'（备份：{bak}）' if bak else ''))
             else:
                 print('📝 已自动补全 Selected Publications（未写回 CV.md；可在 front matter 设置 writeback_enabled: true 开启）')
-    meta, body = parse_front_matter(md_text)
-    secs = split_sections(body)
+    if state is not None:
+        state["autofill_src"] = source_hash
+
+    trace_stage("sections")
+    meta, body = memo("front_matter", md_text, parse_front_matter)
+    secs = memo("sections", body, split_sections)
+
+    global pub_fragment_salt
+    pub_fragment_salt = content_hash(highlight_author + "\0" + json.dumps(PUB_META_CACHE, ensure_ascii=False, sort_keys=True))
+
+    # bibtex/all.bib: every local entry of the publications section in one file
+    if as_bool(meta.get("bibtex_all", bibtex_batch > 0), False) and secs.get(PUB_SECTION_TITLE):
+        write_bibtex_bundle(secs[PUB_SECTION_TITLE])
 
     # Only keep these 3
     # Render all sections in order.
@@ -2069,6 +4345,7 @@ def main():
     # Rule:
     #   - If front matter provides home_sections (list of '##' titles), render those in that order.
     #   - Else, render all sections EXCEPT those assigned to other internal pages via nav item 'section(s)'.
+    trace_stage("layout")
     nav_cfg = []
     for _k in ("nav", "nav_items", "navbar"):
         if isinstance(meta.get(_k), list):
@@ -2079,7 +4356,7 @@ def main():
     resolved_section_map, assigned_titles = resolve_nav_section_map(nav_cfg, all_titles)
 
     home_sections_cfg = meta.get("home_sections", None)
-    sections_out: List[str] = []
+    home_titles: List[str] = []
 
     if isinstance(home_sections_cfg, list) and home_sections_cfg:
         # Explicit list: render only those (ignore assigned_titles).
@@ -2090,10 +4367,7 @@ def main():
             sec_body = secs.get(t, "")
             if not sec_body.strip():
                 continue
-            if t == PUB_SECTION_TITLE:
-                sections_out.append(section_html(t, render_publications(sec_body)))
-            else:
-                sections_out.append(section_html(t, render_simple_md(sec_body)))
+            home_titles.append(t)
     else:
         # Default: render everything except what is assigned to internal pages.
         for sec_title, sec_body in secs.items():
@@ -2101,10 +4375,7 @@ def main():
                 continue
             if sec_title.strip() in assigned_titles:
                 continue
-            if sec_title.strip() == PUB_SECTION_TITLE:
-                sections_out.append(section_html(sec_title, render_publications(sec_body)))
-            else:
-                sections_out.append(section_html(sec_title, render_simple_md(sec_body)))
+            home_titles.append(sec_title)
 
     # meta
     name = str(meta.get("name", "Your Name"))
@@ -2256,7 +4527,7 @@ def main():
 
     banner_block = ""
     if str(banner_text).strip():
-        ctype = re.sub(r"[^a-z0-9_-]+", "", (banner_type or "recruit").strip().lower()) or "recruit"
+        ctype = _CSS_CLASS_STRIP_RE.sub("", (banner_type or "recruit").strip().lower()) or "recruit"
         title = (banner_title or "").strip()
         title_html = ""
         if title:
@@ -2331,13 +4602,53 @@ def main():
             f'<span>{esc(wechat_title)}</span>'
             '</div>'
             f'<a href="{esc(qr_src)}" target="_blank" rel="noopener noreferrer">'
-            f'<img src="{esc(qr_src)}" alt="{esc(show_name)}" loading="lazy" />'
+            f'<img src="{esc(qr_src)}" alt="{esc(show_name)}" loading="lazy"$QR_ATTRS />'
             '</a>'
             f'<div class="wechat-name">{esc(show_name)}</div>'
             f'<div class="wechat-hint">{esc(wechat_hint)}</div>'
             '</div>'
         )
 
+    # Responsive images: width/height (no layout shift) and, with Pillow, srcset variants
+    responsive_images = as_bool(meta.get("responsive_images", False), False)
+    image_infos: Dict[str, Optional[dict]] = {}
+    banner_image = str(meta.get("banner_image", "")).strip()
+    image_srcs = {"avatar": avatar, "wechat_qr": qr_src, "banner": banner_image}
+    if responsive_images:
+        image_cache = load_image_cache()
+        for key, src in image_srcs.items():
+            image_infos[key] = prepare_image(src, IMAGE_SLOTS[key][0], image_cache, generate=write) if src else None
+        if write:
+            save_image_cache(image_cache)
+        if write and os.path.isdir(IMAGE_DIR):
+            live = {v for info in image_infos.values() if info for _w, v in info["variants"]}
+            # Only stale variants: never anything that was not generated by prepare_image
+            for fn in os.listdir(IMAGE_DIR):
+                p = os.path.join(IMAGE_DIR, fn)
+                if p not in live and _IMAGE_VARIANT_RE.match(fn) and os.path.isfile(p):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+    if write:
+        # The stylesheet background: generated @media block with the variants (removed again when off)
+        banner_css_path = str(meta.get("banner_css", "")).strip() or BANNER_CSS_PATH
+        block = banner_css(image_infos.get("banner"), local_image_path(banner_image), banner_css_path)
+        try:
+            if write_banner_css(banner_css_path, block):
+                print('🖼️ 已更新 {} 的 {} 响应式背景图'.format(banner_css_path, BANNER_SELECTOR))
+        except OSError as e:
+            print('⚠️ 写入 {} 失败：{}'.format(banner_css_path, e))
+
+    def image_attrs_for(key: str, out_filename: str) -> str:
+        return img_attrs(image_infos.get(key), image_srcs[key], out_filename, IMAGE_SLOTS[key][1])
+
+    def sidebar_images(out_filename: str) -> Dict[str, str]:
+        return {
+            "AVATAR_ATTRS": image_attrs_for("avatar", out_filename),
+            "WECHAT_BLOCK": wechat_block.replace("$QR_ATTRS", image_attrs_for("wechat_qr", out_filename)),
+        }
+
     pdf_btn = ""
     if blogurl:
         pdf_btn = '<a class="btn primary" href="{}" target="_blank" rel="noopener">Research Blog</a>'.format(esc(blogurl))
@@ -2353,7 +4664,7 @@ def main():
         return os.path.join(CONTENT_DIR, base + '.content.html')
 
     def extract_body_inner(s: str) -> str:
-        m = re.search(r'<body[^>]*>(.*?)</body>', s, flags=re.I|re.S)
+        m = _BODY_INNER_RE.search(s)
         if m:
             return m.group(1).strip()
         return (s or '').strip()
@@ -2368,6 +4679,7 @@ def main():
             f"<p class=\"muted\">If you already had <code>{hf}</code>, the first run copies it into <code>{cp}</code> automatically.</p>"
         )
 
+    @traced("io")
     def ensure_content_source(href: str, title: str) -> str:
         content_path = content_file_for(href)
 
@@ -2377,52 +4689,54 @@ def main():
             base = base[2:]
         legacy = base + '.content.html'
         if (not os.path.exists(content_path)) and os.path.exists(legacy):
+            if not write:
+                with open(legacy, 'r', encoding='utf-8', errors='ignore') as fsrc:
+                    write_output(content_path, fsrc.read())
+                return content_path
             os.makedirs(os.path.dirname(content_path) or '.', exist_ok=True)
+            with open(legacy, 'r', encoding='utf-8', errors='ignore') as fsrc:
+                old = fsrc.read()
+            note_build_write(content_path, old)
             try:
                 os.replace(legacy, content_path)
             except OSError:
-                with open(legacy, 'r', encoding='utf-8', errors='ignore') as fsrc:
-                    old = fsrc.read()
                 with open(content_path, 'w', encoding='utf-8') as fdst:
                     fdst.write(old)
 
         if os.path.exists(content_path):
             return content_path
-        d = os.path.dirname(content_path)
-        if d:
-            os.makedirs(d, exist_ok=True)
 
         # If an old page file exists (and is NOT one of our generated shells), copy it into *.content.html
+        content = placeholder_content(href, title)
         if os.path.exists(href):
             with open(href, 'r', encoding='utf-8', errors='ignore') as f:
                 old = f.read()
             if 'CV_SHELL_GENERATED' not in old:
-                with open(content_path, 'w', encoding='utf-8') as f:
-                    f.write(old)
-            else:
-                with open(content_path, 'w', encoding='utf-8') as f:
-                    f.write(placeholder_content(href, title))
-        else:
+                content = old
+        if write:
+            d = os.path.dirname(content_path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            note_build_write(content_path, content)
             with open(content_path, 'w', encoding='utf-8') as f:
-                f.write(placeholder_content(href, title))
+                f.write(content)
+        else:
+            write_output(content_path, content)
 
         return content_path
 
-    def render_page(out_filename: str, sections_list: List[str]) -> None:
-        out_dir = os.path.dirname(out_filename)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
-
+    def render_page(out_filename: str, sections_list: List[str]) -> str:
+        """Substitute HTML_DOC and write the page; returns the log line (printed by the caller)."""
         out_html = HTML_DOC.safe_substitute(
             PAGE_TITLE=esc(str(meta.get('title', 'CV'))),
-            STYLE=STYLE.strip('\n'),
+            **page_head_blocks(out_filename, asset_bundle, critical_inline),
             AVATAR=esc(avatar),
             NAME=esc(name),
             ROLE=esc(role),
             TAGS_BLOCK=tags_block,
             BANNER_BLOCK=banner_block,
             CONTACT_BLOCK=contact_block,
-            WECHAT_BLOCK=wechat_block,
+            **sidebar_images(out_filename),
             PDF_BTN=pdf_btn,
             SUBTITLE=esc(subtitle),
             NAVBAR=build_navbar(out_filename),
@@ -2430,14 +4744,105 @@ def main():
             YEAR=str(now.year),
             SECTIONS='\n'.join(sections_list),
         )
-
-        with open(out_filename, 'w', encoding='utf-8') as f:
-            f.write(out_html)
-
-        print('✅ 生成成功：{}'.format(out_filename))
-
+        size_note = ''
+        raw_size = len(out_html.encode('utf-8'))
+        # Unminified size for the build report (kept in the manifest for pages skipped next time)
+        manifest[out_filename]["raw_bytes"] = raw_size
+        if minify_pages:
+            out_html = minify_html(out_html)
+            min_size = len(out_html.encode('utf-8'))
+            size_note = '（{:.1f} KB → {:.1f} KB，-{:.0f}%）'.format(
+                raw_size / 1024, min_size / 1024, 100.0 * (raw_size - min_size) / max(raw_size, 1))
+
+        if not write:
+            rendered[out_filename.replace(os.sep, "/")] = out_html
+            return '🖥️ 已渲染（内存）：{}{}'.format(out_filename, size_note)
+        # Only touch the file if something other than the date stamp changed,
+        # so unchanged pages keep their mtime (and CDN objects stay valid).
+        if write_text_if_changed(out_filename, out_html, normalize=strip_page_stamps):
+            return '✅ 生成成功：{}{}'.format(out_filename, size_note)
+        return '⏸️ 内容未变化，未写入：{}{}'.format(out_filename, size_note)
+
+    trace_stage("assets")
+    # Shared CSS/JS: inline in every page (default) or one cacheable bundle ('assets: external')
+    asset_bundle = None
+    critical_inline = False
+    minify_pages = as_bool(meta.get("minify", False), False)
+    if str(meta.get("assets", "inline")).strip().lower() in ("external", "bundle", "files"):
+        asset_bundle = write_asset_bundle(minify=minify_pages, out=None if write else rendered)
+        critical_inline = as_bool(meta.get("critical_css", False), False)
+
+    # Incremental build: a page is only re-rendered if one of its inputs changed
+    # (front matter, STYLE/HTML_DOC, this script, its CV.md sections or its _content source).
+    incremental = write and (not force) and as_bool(meta.get("incremental", True), True)
+    if not incremental:
+        prev_manifest = {}
+    elif state is not None and "manifest" in state:
+        prev_manifest = state["manifest"]
+    else:
+        prev_manifest = load_build_manifest()
+    manifest: Dict[str, dict] = {}
+    fm_raw, _ = split_front_matter_raw(md_text)
+    generator_hash = state.get("generator_hash") if state is not None else None
+    if generator_hash is None:
+        try:
+            with open(__file__, "r", encoding="utf-8") as f:
+                generator_hash = content_hash(f.read())
+        except OSError:
+            generator_hash = ""
+        if state is not None:
+            state["generator_hash"] = generator_hash
+    common_inputs = {
+        "front_matter": content_hash(fm_raw),
+        "style": content_hash(STYLE),
+        "html_doc": content_hash(HTML_DOC.template),
+        "generator": generator_hash,
+    }
+    if image_infos:
+        common_inputs["images"] = content_hash(json.dumps(image_infos, sort_keys=True))
+    def section_inputs(titles: List[str]) -> Dict[str, str]:
+        inputs = {"section:" + t: content_hash(secs.get(t, "")) for t in titles}
+        if PUB_SECTION_TITLE in titles:
+            # Publication order also depends on the IEEE metadata used for sorting
+            inputs["pub_meta"] = pub_fragment_salt
+        return inputs
+
+    # Pages in nav order: (out_filename, sections) or (out_filename, None) if skipped.
+    # Sections are rendered here, serially (they share the fragment cache); the
+    # HTML_DOC substitution and file writes run afterwards, optionally in parallel.
+    page_jobs: List[Tuple[str, Optional[List[str]]]] = []
+
+    def emit_page(out_filename: str, inputs: Dict[str, str], make_sections) -> None:
+        page_inputs = dict(common_inputs)
+        page_inputs.update(inputs)
+        prev = prev_manifest.get(out_filename) or {}
+        manifest[out_filename] = {"inputs": page_inputs}
+        if incremental and prev.get("inputs") == page_inputs and os.path.exists(out_filename):
+            if "raw_bytes" in prev:
+                manifest[out_filename]["raw_bytes"] = prev["raw_bytes"]
+            page_jobs.append((out_filename, None))
+            return
+        page_jobs.append((out_filename, make_sections()))
+
+    def run_page_job(job: Tuple[str, Optional[List[str]]]) -> str:
+        out_filename, sections_list = job
+        if sections_list is None:
+            return '⏭️ 未变化，跳过：{}'.format(out_filename)
+        stats = _PROFILE_STATS.get("render_page")
+        t0 = time.perf_counter()
+        try:
+            with trace_span("render_page", "render", page=out_filename):
+                return render_page(out_filename, sections_list)
+        finally:
+            if stats is not None:
+                with _PROFILE_LOCK:
+                    stats[0] += 1
+                    stats[1] += time.perf_counter() - t0
+
+    trace_stage("render sections")
     # 1) Home page
-    render_page(out_path, sections_out)
+    emit_page(out_path, section_inputs(home_titles),
+              lambda: [render_cv_section(t, secs[t]) for t in home_titles])
 
     
     # 2) Pages for each internal nav link (local *.html)
@@ -2457,38 +4862,120 @@ def main():
         # Mode A: CV.md-driven page
         if configured_md_sections:
             if not sections_cfg:
-                page_sections = [section_html(title, '<p class="muted">（该页面已配置 sections，但未匹配到任何可渲染的标题；如果你使用了 "*"，它只会分配给 nav 中第一个包含 "*" 的页面）</p>')]
-                render_page(href, page_sections)
+                emit_page(href, {}, lambda title=title: [section_html(title, '<p class="muted">（该页面已配置 sections，但未匹配到任何可渲染的标题；如果你使用了 "*"，它只会分配给 nav 中第一个包含 "*" 的页面）</p>')])
                 continue
 
-            page_sections: List[str] = []
-            for sec_title in sections_cfg:
-                st = str(sec_title).strip()
-                if not st:
-                    continue
-                sec_body = secs.get(st, "")
-                if not sec_body.strip():
-                    page_sections.append(section_html(st, '<p class="muted">（未在 CV.md 中找到该标题的内容）</p>'))
-                    continue
-                if st == PUB_SECTION_TITLE:
-                    page_sections.append(section_html(st, render_publications(sec_body)))
-                else:
-                    page_sections.append(section_html(st, render_simple_md(sec_body)))
-            if not page_sections:
-                page_sections = [section_html(title, '<p class="muted">（未配置任何可渲染的标题）</p>')]
-            render_page(href, page_sections)
+            page_titles = [str(t).strip() for t in sections_cfg if str(t).strip()]
+
+            def make_mode_a(title=title, page_titles=page_titles) -> List[str]:
+                page_sections: List[str] = []
+                for st in page_titles:
+                    sec_body = secs.get(st, "")
+                    if not sec_body.strip():
+                        page_sections.append(section_html(st, '<p class="muted">（未在 CV.md 中找到该标题的内容）</p>'))
+                        continue
+                    page_sections.append(render_cv_section(st, sec_body))
+                if not page_sections:
+                    page_sections = [section_html(title, '<p class="muted">（未配置任何可渲染的标题）</p>')]
+                return page_sections
+
+            emit_page(href, section_inputs(page_titles), make_mode_a)
             continue
 
         # Mode B: External HTML content wrapped into our style
         content_path = ensure_content_source(href, title)
-        with open(content_path, 'r', encoding='utf-8', errors='ignore') as f:
-            raw = f.read()
-        body = extract_body_inner(raw)
-
-        page_sections = [section_html(title, '<div class="ext-content">' + body + '</div>')]
-        render_page(href, page_sections)
-
-
+        raw = read_output(content_path)
+
+        emit_page(href, {"content:" + content_path: content_hash(raw)},
+                  lambda title=title, raw=raw: [section_html(title, '<div class="ext-content">' + extract_body_inner(raw) + '</div>')])
+
+    # Substitute + write every page. With workers > 1 this uses a thread pool;
+    # ex.map keeps results (and therefore the console log) in nav order.
+    trace_stage("write pages")
+    workers = render_workers if render_workers is not None else int(as_float(meta.get("render_workers"), 1))
+    workers = min(max(1, workers), len(page_jobs) or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            logs = list(ex.map(run_page_job, page_jobs))
+    else:
+        logs = [run_page_job(job) for job in page_jobs]
+    for line in logs:
+        print(line)
+
+    trace_stage("manifest")
+    if write:
+        save_build_manifest(manifest)
+        if state is not None:
+            state["manifest"] = manifest
+
+    # Precompressed .gz/.br next to every page, BibTeX file and asset bundle
+    if write and as_bool(meta.get("precompress", False), False):
+        trace_stage("precompress")
+        outputs = [job[0] for job in page_jobs]
+        if os.path.isdir(BIB_DIR):
+            outputs += [os.path.join(BIB_DIR, fn) for fn in os.listdir(BIB_DIR) if fn.endswith(".bib")]
+        if asset_bundle:
+            outputs += list(asset_bundle)
+        written = precompress_outputs(outputs)
+        kinds = ".gz / .br" if _brotli_module() is not None else ".gz（未安装 brotli，跳过 .br）"
+        print('🗜️ 预压缩：更新 {} 个文件（{}）'.format(len(written), kinds))
+    trace_stage(None)
+    print('🧩 片段缓存：命中 {} 次，未命中 {} 次'.format(FRAGMENT_CACHE_STATS["hits"], FRAGMENT_CACHE_STATS["misses"]))
+    stats = pool_stats()
+    if stats["requests"]:
+        print('🔌 连接池：请求 {requests} 次，新建连接 {connections} 个，复用 {reused} 次，重试 {retries} 次'.format(**stats))
+    # All fetching is done: do not keep idle sockets open until the next (watch) build
+    close_idle_connections()
+    if not write:
+        # The BibTeX files the pages link to, kept in memory like the pages themselves
+        rendered.update({k: v for k, v in (preview_outputs or {}).items() if k.startswith(BIB_DIR + "/")})
+    preview_outputs = None
+
+    # Build report and performance budgets (gzip/minified from the pages as served, skipped pages
+    # included; raw is the size before minification, recorded by render_page)
+    rules = [str(r).strip() for r in (meta.get("budgets") or []) if str(r).strip()]
+    budgets_file = budgets_path or str(meta.get("budgets_file", "")).strip()
+    if budgets_file:
+        try:
+            rules += load_budget_rules(budgets_file)
+        except (OSError, ValueError) as e:
+            raise SystemExit("读取性能预算文件失败：{}（{}）".format(budgets_file, e))
+    if report_path or rules:
+        trace_stage("report")
+        if write:
+            pages: Dict[str, str] = {}
+            for out_filename, _sections in page_jobs:
+                with open(out_filename, "r", encoding="utf-8") as f:
+                    pages[out_filename.replace(os.sep, "/")] = f.read()
+        else:
+            pages = {k: v for k, v in rendered.items() if k.endswith(".html")}
+        raw_sizes = {out_filename.replace(os.sep, "/"): manifest[out_filename]["raw_bytes"]
+                     for out_filename, _sections in page_jobs if "raw_bytes" in manifest.get(out_filename, {})}
+        report = build_report(pages, (time.perf_counter() - build_t0) * 1000, stats["requests"] - fetches0,
+                              raw_sizes)
+        previous = None
+        if report_path and os.path.exists(report_path):
+            try:
+                with open(report_path, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+            except (OSError, ValueError):
+                previous = None
+        results = check_budgets(report, rules, previous)
+        report["budgets"] = results
+        if report_path:
+            folder = os.path.dirname(report_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            _write_bytes_atomic(report_path, (json.dumps(report, ensure_ascii=False, indent=1) + "\n").encode("utf-8"))
+            print('📊 构建报告：{}（{} 个页面，gzip 共 {:.1f} KB，网络请求 {} 次，{:.0f} ms）'.format(
+                report_path, report["totals"]["pages"], report["totals"]["gzip"] / 1024,
+                report["network_fetches"], report["build_ms"]))
+        trace_stage(None)
+        if any(not r["ok"] for r in results):
+            raise SystemExit(budget_failure_message(results))
+        if results:
+            print('📏 性能预算：{} 项检查全部通过'.format(len(results)))
+    return None if write else rendered
 
 
 if __name__ == "__main__":